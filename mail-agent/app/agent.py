@@ -16,7 +16,12 @@
 from google.adk.agents import Agent
 from google.adk.apps.app import App
 
-from .mail_tools import list_emails_and_get_raw_header
+from .app_utils.progress import run_in_thread
+from .mail_tools import (
+    get_mail_scan_details,
+    list_emails_and_get_raw_header,
+    scan_domain_mailboxes,
+)
 
 
 root_agent = Agent(
@@ -35,8 +40,24 @@ root_agent = Agent(
     4. 조회 종료 날짜 (end_date): (YYYY/MM/DD 형식)
     
     모든 인자가 확보된 후에만 툴을 호출하고, 결과를 리스트 및 요약하여 사용자에게 제공합니다.
+    기본적으로 헤더만 조회(fetch_mode='metadata')하며, 사용자가 원본 메일 전문 기반의 정밀 분석을
+    명시적으로 요청한 경우에만 fetch_mode='raw'를 사용하세요.
+
+    사용자가 특정 사용자가 아닌 **도메인 전체** 메일함의 스팸 점검을 요청하면
+    'scan_domain_mailboxes' 툴을 사용하세요. 이 경우 분석 대상 이메일 대신
+    조회 도메인 (domain, 예: example.com)을 확보해야 합니다.
+
+    메일 조회 결과는 기본적으로 요약(집계 + 상위 스팸 의심 메일)으로 반환됩니다.
+    사용자가 개별 메일의 상세 분석 결과를 원하면 응답의 cursor(또는 next_cursor)로
+    'get_mail_scan_details' 툴을 호출하여 이어서 조회하세요. 도메인 전체 조회에서
+    사용자별 결과 전체가 필요하면 users_cursor로 같은 툴을 호출하세요.
     """,
-    tools=[list_emails_and_get_raw_header],
+    # 조회 중 진행 상황 이벤트를 내보낼 수 있도록 툴을 별도 스레드에서 실행
+    tools=[
+        run_in_thread(list_emails_and_get_raw_header),
+        run_in_thread(scan_domain_mailboxes),
+        get_mail_scan_details,
+    ],
 )
 
 app = App(root_agent=root_agent, name="app")
@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import functools
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import (
+    DataPart,
+    Message,
+    Part,
+    Role,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+
+# 중간 결과를 내보내는 주기: N건 처리마다 또는 T초마다 (둘 중 먼저 도달하는 조건)
+PROGRESS_EVERY_N = int(os.getenv("MAIL_PROGRESS_EVERY_N", "50"))
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("MAIL_PROGRESS_INTERVAL_SECONDS", "5"))
+
+# 현재 A2A 요청의 진행 상황 수신 함수. A2A 요청 밖(adk web 등)에서는 None입니다.
+_progress_sink: ContextVar[Callable[[dict], None] | None] = ContextVar(
+    "progress_sink", default=None
+)
+
+
+def report_progress(snapshot: dict) -> None:
+    """진행 상황 스냅샷을 현재 A2A 요청의 이벤트 스트림으로 전달합니다."""
+    sink = _progress_sink.get()
+    if sink is not None:
+        sink(snapshot)
+
+
+class ProgressThrottle:
+    """
+    누적 카운트를 관리하고, every_n건 또는 interval_seconds초마다 한 번씩만
+    report_progress를 호출하는 도우미입니다.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        every_n: int = PROGRESS_EVERY_N,
+        interval_seconds: float = PROGRESS_INTERVAL_SECONDS,
+    ) -> None:
+        self.stage = stage
+        self.every_n = every_n
+        self.interval_seconds = interval_seconds
+        self.counts: dict[str, int] = {}
+        self._pending = 0
+        self._last_emit = time.monotonic()
+
+    def update(self, processed: int = 1, **counts: int) -> None:
+        """처리 건수와 추가 카운트(예: spam_count=1)를 누적하고 필요 시 전달합니다."""
+        self.counts["processed"] = self.counts.get("processed", 0) + processed
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        self._pending += processed
+        if (
+            self._pending >= self.every_n
+            or time.monotonic() - self._last_emit >= self.interval_seconds
+        ):
+            self.flush()
+
+    def flush(self, done: bool = False) -> None:
+        """현재까지의 누적 카운트를 즉시 전달합니다."""
+        self._pending = 0
+        self._last_emit = time.monotonic()
+        report_progress({"stage": self.stage, "done": done, **self.counts})
+
+
+def run_in_thread(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """
+    동기 툴 함수를 별도 스레드에서 실행하는 비동기 툴로 감쌉니다.
+
+    ADK는 동기 툴을 이벤트 루프에서 직접 실행하므로, 오래 걸리는 조회 중에는
+    진행 상황 이벤트를 내보낼 수 없습니다. asyncio.to_thread는 컨텍스트 변수를
+    복사하므로 스레드 안에서도 report_progress가 현재 요청으로 전달됩니다.
+    functools.wraps로 이름/시그니처/docstring을 유지하여 툴 선언은 그대로입니다.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+def _format_progress_text(snapshot: dict) -> str:
+    counts = ", ".join(
+        f"{key}={value}"
+        for key, value in snapshot.items()
+        if key not in ("stage", "done")
+    )
+    return f"[진행 상황] {snapshot['stage']}: {counts}"
+
+
+class ProgressA2aAgentExecutor(A2aAgentExecutor):
+    """
+    툴 실행 중 report_progress로 전달된 중간 결과를 A2A 작업 상태 업데이트
+    (TaskState.working, final=False)로 이벤트 스트림에 내보내는 실행기입니다.
+    """
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        loop = asyncio.get_running_loop()
+
+        def _sink(snapshot: dict) -> None:
+            event = TaskStatusUpdateEvent(
+                task_id=context.task_id,
+                context_id=context.context_id,
+                final=False,
+                status=TaskStatus(
+                    state=TaskState.working,
+                    timestamp=datetime.now(timezone.utc).isoformat(),
+                    message=Message(
+                        message_id=str(uuid.uuid4()),
+                        role=Role.agent,
+                        parts=[
+                            Part(root=TextPart(text=_format_progress_text(snapshot))),
+                            Part(root=DataPart(data=snapshot)),
+                        ],
+                    ),
+                ),
+                metadata={"progress": True},
+            )
+            # 툴은 워커 스레드에서 실행되므로 이벤트 루프 스레드에 enqueue를 예약
+            asyncio.run_coroutine_threadsafe(event_queue.enqueue_event(event), loop)
+
+        token = _progress_sink.set(_sink)
+        try:
+            await super().execute(context, event_queue)
+        finally:
+            _progress_sink.reset(token)
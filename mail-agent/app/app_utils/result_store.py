@@ -0,0 +1,133 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from google.adk.tools.tool_context import ToolContext
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paged_results (
+    result_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    rows TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_paged_results_created_at
+    ON paged_results (created_at);
+"""
+# SQLite를 여러 워커가 함께 쓸 때 잠금을 기다리는 시간(초)
+SQLITE_BUSY_TIMEOUT_SECONDS = 5
+
+
+def result_owner(tool_context: ToolContext | None) -> str:
+    """
+    커서를 발급받은 대화를 나타내는 키를 반환합니다 (사용자 ID/세션 ID).
+    ADK 밖에서 직접 호출한 경우(tool_context 없음)는 빈 문자열입니다.
+    """
+    if tool_context is None:
+        return ""
+    session = tool_context.session
+    return f"{session.user_id}/{session.id}"
+
+
+class PagedResultStore:
+    """
+    커서로 이어서 조회할 목록을 보관하는 저장소입니다.
+
+    결과는 발급받은 대화(owner)에 묶이며, 다른 대화에서 같은 커서를 사용하면
+    찾을 수 없는 결과로 처리합니다. 메모리에는 최근 max_entries개만 LRU로 보관하고,
+    path를 지정하면 SQLite 파일에도 저장하여 같은 파일을 쓰는 다른 워커 프로세스나
+    재시작 후에도 ttl_seconds 동안 이어서 조회할 수 있습니다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: str = "") -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # result_id → (owner, 저장 시각, 목록)
+        self._results: OrderedDict[str, tuple[str, float, list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._stats = {"saved": 0, "hits": 0, "db_reads": 0, "misses": 0}
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    @property
+    def shared(self) -> bool:
+        """여러 워커 프로세스가 같은 결과를 읽을 수 있는지 여부."""
+        return self._conn is not None
+
+    def save(self, owner: str, rows: list[dict]) -> str:
+        """목록을 보관하고 result_id를 반환합니다. 오래된 결과부터 제거합니다."""
+        result_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._results[result_id] = (owner, now, rows)
+            self._evict()
+            self._stats["saved"] += 1
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "DELETE FROM paged_results WHERE created_at < ?",
+                        (now - self.ttl_seconds,),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO paged_results VALUES (?, ?, ?, ?)",
+                        (result_id, owner, now, json.dumps(rows, ensure_ascii=False)),
+                    )
+        return result_id
+
+    def load(self, owner: str, result_id: str) -> list[dict] | None:
+        """owner가 발급받은 결과 중 만료되지 않은 것을 반환합니다. 없으면 None."""
+        now = time.time()
+        with self._lock:
+            entry = self._results.get(result_id)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT owner, created_at, rows FROM paged_results "
+                    "WHERE result_id = ?",
+                    (result_id,),
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1], json.loads(row[2]))
+                    self._results[result_id] = entry
+                    self._stats["db_reads"] += 1
+            if entry is None or entry[0] != owner or now - entry[1] >= self.ttl_seconds:
+                self._stats["misses"] += 1
+                return None
+            self._results.move_to_end(result_id)
+            self._evict()
+            self._stats["hits"] += 1
+            return entry[2]
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {**self._stats, "size": len(self._results), "shared": self.shared}
+
+    def _evict(self) -> None:
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
@@ -0,0 +1,211 @@
+import json
+import os
+from collections import Counter
+from itertools import islice
+
+from .app_utils.result_store import PagedResultStore
+
+# LLM에 전달하는 툴 응답 한 번의 최대 크기 (UTF-8 바이트, 대략 바이트/3 ≈ 토큰)
+OUTPUT_BYTE_BUDGET = int(os.getenv("MAIL_OUTPUT_BYTE_BUDGET", "8000"))
+# 요약 응답에 포함할 스팸 의심 메일 / 발신 도메인 수
+TOP_SUSPICIOUS_COUNT = 10
+TOP_DOMAIN_COUNT = 10
+# 도메인 전체 조회 응답에 포함할 스팸 의심 메일이 많은 사용자 / 실패한 사용자 수
+TOP_USER_COUNT = 10
+# 커서로 이어서 조회할 수 있도록 보관하는 최근 조회 결과 수 (워커 프로세스별 메모리)
+SCAN_RESULT_CACHE_SIZE = int(os.getenv("MAIL_SCAN_RESULT_CACHE_SIZE", "32"))
+# 커서를 발급한 뒤 이어서 조회할 수 있는 시간(초)
+SCAN_RESULT_TTL_SECONDS = float(os.getenv("MAIL_SCAN_RESULT_TTL_SECONDS", "3600"))
+# 조회 결과를 워커 프로세스 간에 공유할 SQLite 파일 경로. 비어 있으면 메모리에만
+# 보관하므로 커서는 발급한 워커에서만 이어서 조회할 수 있습니다.
+MAIL_SCAN_RESULT_DB_PATH = os.getenv("MAIL_SCAN_RESULT_DB_PATH", "")
+SUBJECT_MAX_CHARS = 80
+
+scan_result_store = PagedResultStore(
+    SCAN_RESULT_CACHE_SIZE, SCAN_RESULT_TTL_SECONDS, path=MAIL_SCAN_RESULT_DB_PATH
+)
+
+
+def _encoded_size(value: object) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _compact_message(result: dict) -> dict:
+    """요약 응답용으로 분석 결과에서 판단에 필요한 필드만 남깁니다."""
+    subject = result.get("subject", "")
+    if len(subject) > SUBJECT_MAX_CHARS:
+        subject = subject[:SUBJECT_MAX_CHARS] + "…"
+    return {
+        "id": result["id"],
+        "subject": subject,
+        "sender_domain": result.get("sender_domain", ""),
+        "spam_score": result.get("spam_score", 0),
+        "failed_checks": result.get("failed_checks", []),
+    }
+
+
+def build_aggregate_report(
+    results: list[dict],
+    spam_threshold: float,
+    owner: str = "",
+    byte_budget: int = OUTPUT_BYTE_BUDGET,
+) -> dict:
+    """
+    메시지별 분석 결과를 판정별/실패 항목별/발신 도메인별 집계와 상위 스팸 의심
+    메일 목록으로 요약합니다. 응답 크기가 byte_budget을 넘지 않도록 스팸 의심 메일
+    목록을 줄이며, 전체 결과는 owner(대화)에 묶어 보관한 뒤 cursor로 get_page를
+    통해 이어서 조회합니다.
+    """
+    by_verdict = Counter()
+    by_failed_check = Counter()
+    domain_totals = Counter()
+    domain_spam = Counter()
+    suspicious = []
+    for result in results:
+        if "error" in result:
+            by_verdict["error"] += 1
+            continue
+        domain = result.get("sender_domain") or "(unknown)"
+        domain_totals[domain] += 1
+        if result.get("spam_score", 0) >= spam_threshold:
+            by_verdict["spam"] += 1
+            domain_spam[domain] += 1
+            by_failed_check.update(result.get("failed_checks", []))
+            suspicious.append(result)
+        else:
+            by_verdict["clean"] += 1
+
+    suspicious.sort(key=lambda result: result.get("spam_score", 0), reverse=True)
+    # 상세 결과는 스팸 의심 메일을 점수순으로 먼저, 나머지를 원래 순서대로 뒤에 배치
+    suspicious_ids = {id(result) for result in suspicious}
+    detail_rows = suspicious + [
+        result for result in results if id(result) not in suspicious_ids
+    ]
+    report = {
+        "total": len(results),
+        "by_verdict": dict(by_verdict),
+        "by_failed_check": dict(by_failed_check),
+        "top_sender_domains": [
+            {"domain": domain, "count": count, "spam_count": domain_spam[domain]}
+            for domain, count in domain_totals.most_common(TOP_DOMAIN_COUNT)
+        ],
+        "top_suspicious": [
+            _compact_message(result) for result in suspicious[:TOP_SUSPICIOUS_COUNT]
+        ],
+        "cursor": (
+            f"{scan_result_store.save(owner, detail_rows)}:0" if detail_rows else None
+        ),
+    }
+
+    while report["top_suspicious"] and _encoded_size(report) > byte_budget:
+        report["top_suspicious"].pop()
+        report["truncated"] = True
+    return report
+
+
+def _page_rows(
+    scan_id: str, rows: list[dict], offset: int, byte_budget: int
+) -> tuple[list[dict], str | None]:
+    """offset부터 byte_budget 안에 들어가는 행과 다음 cursor(없으면 None)를 반환합니다."""
+    page: list[dict] = []
+    used = _encoded_size({"data": [], "next_cursor": f"{scan_id}:{len(rows)}"})
+    for row in islice(rows, offset, None):
+        row_size = _encoded_size(row) + 2
+        # 예산을 넘더라도 최소 한 건은 반환하여 진행이 멈추지 않도록 함
+        if page and used + row_size > byte_budget:
+            break
+        page.append(row)
+        used += row_size
+
+    next_offset = offset + len(page)
+    return page, f"{scan_id}:{next_offset}" if next_offset < len(rows) else None
+
+
+def get_page(
+    cursor: str, owner: str = "", byte_budget: int = OUTPUT_BYTE_BUDGET
+) -> dict:
+    """
+    cursor("<scan_id>:<offset>") 위치부터 byte_budget 안에 들어가는 만큼 상세 결과를
+    반환합니다. 더 남은 결과가 있으면 next_cursor를 함께 반환합니다.
+    다른 대화(owner)에서 발급된 cursor는 만료된 것과 같이 처리합니다.
+    """
+    try:
+        scan_id, offset_text = cursor.rsplit(":", 1)
+        offset = int(offset_text)
+    except ValueError:
+        return {"success": False, "error": f"잘못된 cursor입니다: {cursor}"}
+
+    rows = scan_result_store.load(owner, scan_id)
+    if rows is None:
+        return {
+            "success": False,
+            "error": "조회 결과가 만료되었습니다. 메일 조회를 다시 실행하세요.",
+        }
+
+    page, next_cursor = _page_rows(
+        scan_id, rows, offset, byte_budget - _encoded_size({"success": True})
+    )
+    return {"success": True, "data": page, "next_cursor": next_cursor}
+
+
+def paginate(
+    rows: list[dict], owner: str = "", byte_budget: int = OUTPUT_BYTE_BUDGET
+) -> tuple[list[dict], str | None]:
+    """
+    결과 목록을 owner에 묶어 보관하고, byte_budget 안에 들어가는 첫 페이지와
+    나머지를 get_page로 이어서 조회할 cursor(없으면 None)를 반환합니다.
+    """
+    if not rows:
+        return [], None
+    return _page_rows(scan_result_store.save(owner, rows), rows, 0, byte_budget)
+
+
+def build_domain_report(
+    user_results: list[dict], owner: str = "", byte_budget: int = OUTPUT_BYTE_BUDGET
+) -> dict:
+    """
+    도메인 전체 조회의 사용자별 결과를 집계합니다. 사용자별 결과(users_cursor)와
+    스팸 의심 메일(next_cursor)은 owner에 묶어 보관한 뒤 get_page로 이어서 조회하고,
+    응답에는 스팸 의심 메일이 많은 사용자와 실패한 사용자를 TOP_USER_COUNT명까지,
+    스팸 의심 메일은 byte_budget 안에 들어가는 첫 페이지만 포함합니다.
+    """
+    user_rows = [
+        {key: value for key, value in result.items() if key != "suspicious_messages"}
+        for result in user_results
+    ]
+    succeeded = [row for row in user_rows if row["success"]]
+    failed = [row for row in user_rows if not row["success"]]
+    suspicious = sorted(
+        (
+            message
+            for result in user_results
+            if result["success"]
+            for message in result["suspicious_messages"]
+        ),
+        key=lambda message: message.get("spam_score", 0),
+        reverse=True,
+    )
+    report = {
+        "success": True,
+        "summary": {
+            "user_count": len(user_rows),
+            "scanned_user_count": len(succeeded),
+            "failed_user_count": len(failed),
+            "message_count": sum(row["message_count"] for row in succeeded),
+            "spam_count": sum(row["spam_count"] for row in succeeded),
+        },
+        "top_spam_users": sorted(
+            (row for row in succeeded if row["spam_count"]),
+            key=lambda row: row["spam_count"],
+            reverse=True,
+        )[:TOP_USER_COUNT],
+        "failed_users": failed[:TOP_USER_COUNT],
+        "users_cursor": f"{scan_result_store.save(owner, user_rows)}:0",
+        "suspicious_messages": [],
+        "next_cursor": None,
+    }
+    # 스팸 의심 메일 첫 페이지는 나머지 응답 크기를 뺀 예산 안에서 채움
+    report["suspicious_messages"], report["next_cursor"] = paginate(
+        suspicious, owner, byte_budget - _encoded_size(report)
+    )
+    return report
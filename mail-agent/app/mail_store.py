@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .spam_rules import RULES_VERSION
+
+# 분석 결과 저장소 경로. 메일 제목 등 분석 결과가 디스크에 남으므로 설정한 경우에만
+# 저장소를 사용합니다 (기본값: 사용 안 함).
+MAIL_ANALYSIS_DB_PATH = os.getenv("MAIL_ANALYSIS_DB_PATH", "")
+# 저장하는 분석 결과의 필드 구성 버전 (2: spam_score, failed_checks, sender_domain 추가)
+RESULT_SCHEMA_VERSION = 2
+# 저장된 결과가 이 값과 다르면 규칙/필드가 바뀐 것이므로 다시 분석합니다.
+ANALYSIS_VERSION = f"{RESULT_SCHEMA_VERSION}:{RULES_VERSION}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyzed_messages (
+    mailbox TEXT NOT NULL,
+    msg_id TEXT NOT NULL,
+    internal_date INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    rules_version TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (mailbox, msg_id)
+);
+CREATE INDEX IF NOT EXISTS idx_analyzed_messages_date
+    ON analyzed_messages (mailbox, internal_date);
+CREATE TABLE IF NOT EXISTS synced_ranges (
+    mailbox TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    PRIMARY KEY (mailbox, start_ts, end_ts)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    mailbox TEXT PRIMARY KEY,
+    history_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class MailAnalysisStore:
+    """
+    메일함별 스팸 분석 결과와 마지막 동기화 historyId를 저장하는 SQLite 저장소입니다.
+
+    - analyzed_messages: (메일함, 메시지 ID)별 분석 결과와 수신 시각(internalDate, 초),
+      결과를 만든 분석 버전(rules_version)
+    - synced_ranges: 전체 조회가 완료되어 저장소만으로 응답할 수 있는 기간 [start_ts, end_ts)
+    - sync_state: 메일함별 마지막으로 반영한 Gmail historyId
+    """
+
+    def __init__(self, path: str, version: str = ANALYSIS_VERSION) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.version = version
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(analyzed_messages)")
+        }
+        if "rules_version" not in columns:
+            # 버전 컬럼 이전에 저장된 결과는 빈 버전으로 표시되어 다시 분석됩니다.
+            self._conn.execute(
+                "ALTER TABLE analyzed_messages "
+                "ADD COLUMN rules_version TEXT NOT NULL DEFAULT ''"
+            )
+        self._conn.commit()
+
+    def get_history_id(self, mailbox: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT history_id FROM sync_state WHERE mailbox = ?", (mailbox,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_history_id(self, mailbox: str, history_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (mailbox, history_id, updated_at) "
+                "VALUES (?, ?, ?)",
+                (mailbox, history_id, time.time()),
+            )
+
+    def covers(self, mailbox: str, start_ts: int, end_ts: int) -> bool:
+        """[start_ts, end_ts) 기간 전체가 이미 동기화된 기간에 포함되는지 확인합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM synced_ranges "
+                "WHERE mailbox = ? AND start_ts <= ? AND end_ts >= ? LIMIT 1",
+                (mailbox, start_ts, end_ts),
+            ).fetchone()
+        return row is not None
+
+    def add_range(self, mailbox: str, start_ts: int, end_ts: int) -> None:
+        """동기화된 기간을 추가하고, 겹치거나 맞닿은 기존 기간과 병합합니다."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT start_ts, end_ts FROM synced_ranges "
+                "WHERE mailbox = ? AND start_ts <= ? AND end_ts >= ?",
+                (mailbox, end_ts, start_ts),
+            ).fetchall()
+            for row_start, row_end in rows:
+                start_ts = min(start_ts, row_start)
+                end_ts = max(end_ts, row_end)
+            self._conn.executemany(
+                "DELETE FROM synced_ranges "
+                "WHERE mailbox = ? AND start_ts = ? AND end_ts = ?",
+                [(mailbox, row_start, row_end) for row_start, row_end in rows],
+            )
+            self._conn.execute(
+                "INSERT INTO synced_ranges (mailbox, start_ts, end_ts) VALUES (?, ?, ?)",
+                (mailbox, start_ts, end_ts),
+            )
+
+    def upsert_results(self, mailbox: str, rows: list[tuple[str, int, dict]]) -> None:
+        """(메시지 ID, internalDate(초), 분석 결과) 목록을 저장합니다."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO analyzed_messages "
+                "(mailbox, msg_id, internal_date, result, rules_version) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (mailbox, msg_id, internal_date, json.dumps(result), self.version)
+                    for msg_id, internal_date, result in rows
+                ],
+            )
+
+    def delete_messages(self, mailbox: str, msg_ids: list[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM analyzed_messages WHERE mailbox = ? AND msg_id = ?",
+                [(mailbox, msg_id) for msg_id in msg_ids],
+            )
+
+    def query_range(
+        self, mailbox: str, start_ts: int, end_ts: int, limit: int | None = None
+    ) -> list[dict]:
+        """기간 내 분석 결과를 Gmail 목록 조회와 같은 최신순으로 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM analyzed_messages "
+                "WHERE mailbox = ? AND internal_date >= ? AND internal_date < ? "
+                "AND rules_version = ? ORDER BY internal_date DESC LIMIT ?",
+                (
+                    mailbox,
+                    start_ts,
+                    end_ts,
+                    self.version,
+                    -1 if limit is None else limit,
+                ),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def discard_stale(self, mailbox: str) -> bool:
+        """
+        다른 분석 버전으로 저장된 결과가 있으면 메일함의 저장 데이터를 모두 비우고
+        True를 반환합니다. 다음 조회에서 전체를 다시 받아 현재 규칙으로 분석합니다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM analyzed_messages "
+                "WHERE mailbox = ? AND rules_version != ? LIMIT 1",
+                (mailbox, self.version),
+            ).fetchone()
+        if row is None:
+            return False
+        self.clear(mailbox)
+        return True
+
+    def clear(self, mailbox: str) -> None:
+        """메일함의 저장 데이터를 모두 삭제합니다 (historyId 만료 시 전체 재조회용)."""
+        with self._lock, self._conn:
+            for table in ("analyzed_messages", "synced_ranges", "sync_state"):
+                self._conn.execute(f"DELETE FROM {table} WHERE mailbox = ?", (mailbox,))
+
+
+_store: MailAnalysisStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_mail_store() -> MailAnalysisStore | None:
+    """프로세스 공용 저장소를 반환합니다. MAIL_ANALYSIS_DB_PATH가 비어 있으면 None."""
+    global _store
+    if not MAIL_ANALYSIS_DB_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = MailAnalysisStore(MAIL_ANALYSIS_DB_PATH)
+        return _store
@@ -1,11 +1,33 @@
 import base64
 import os
 import sys
-from email import message_from_string
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from googleapiclient.discovery import build
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.message import Message
+from email.parser import HeaderParser
+from email.utils import parseaddr
+from itertools import islice
+from typing import Optional
+
+from google.adk.tools.tool_context import ToolContext
 from googleapiclient.errors import HttpError
 
+from .app_utils.credentials import DelegatedCredentialCache
+from .app_utils.google_services import get_service
+from .app_utils.progress import ProgressThrottle
+from .app_utils.result_store import result_owner
+from .mail_report import build_aggregate_report, build_domain_report, get_page
+from .mail_store import MailAnalysisStore, get_mail_store
+from .spam_rules import (
+    AUTH_RESULT_HEADERS,
+    SPAM_SCORE_THRESHOLD,
+    render_report,
+    score_header_batch,
+    score_headers,
+)
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 try:
@@ -18,67 +40,605 @@ except ModuleNotFoundError:
     from auth import get_delegated_credentials
 
 
+# 위임 자격 증명은 프로세스 전역 캐시에서 재사용하고, 만료 전에 백그라운드에서 갱신
+credential_cache = DelegatedCredentialCache(
+    mint=lambda subject, scopes: get_delegated_credentials(
+        admin_email=subject, scopes=scopes
+    )
+)
+
+# read-only 권한만 필요
+GMAIL_SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
+DIRECTORY_SCOPES = ["https://www.googleapis.com/auth/admin.directory.user.readonly"]
+
+# Gmail Batch 요청 한 번에 묶을 메시지 수 (Gmail 권장 최대값 50, 허용 최대값 100)
+GMAIL_BATCH_SIZE = int(os.getenv("GMAIL_BATCH_SIZE", "50"))
+# Batch에서 실패한 항목을 단건 요청으로 재시도할 때의 재시도 횟수 (429/5xx 지수 백오프)
+GMAIL_SINGLE_GET_RETRIES = int(os.getenv("GMAIL_SINGLE_GET_RETRIES", "3"))
+# messages.list 한 페이지당 요청할 메시지 수 (API 허용 최대값 500)
+GMAIL_LIST_PAGE_SIZE = 500
+# 동시에 진행할 Batch 조회 요청 수 (워커 스레드 수, 워커마다 별도의 Gmail 클라이언트 사용)
+GMAIL_FETCH_WORKERS = int(os.getenv("GMAIL_FETCH_WORKERS", "4"))
+# 도메인 전체 조회 시 동시에 조회할 사용자 메일함 수
+# (메일함마다 GMAIL_FETCH_WORKERS개의 조회 스레드를 추가로 사용)
+DOMAIN_SCAN_WORKERS = int(os.getenv("DOMAIN_SCAN_WORKERS", "4"))
+# 헤더 전용(metadata) 모드에서 요청할 헤더 목록 (스팸 분석과 제목 표시에 필요한 헤더만)
+SPAM_HEADER_NAMES = [*AUTH_RESULT_HEADERS, "Received", "Subject", "From"]
+FETCH_MODES = ("metadata", "raw")
+# 'aggregate'는 예산 내 요약 + cursor, 'detail'은 메시지별 전체 보고서 목록을 반환
+OUTPUT_MODES = ("aggregate", "detail")
+# messages.list 기본 조회 결과에 포함되지 않는 라벨 (증분 동기화 시 저장소에서 제외)
+EXCLUDED_LABELS = {"SPAM", "TRASH"}
+# raw 모드에서 메시지당 디코딩/파싱할 헤더 영역의 최대 바이트 수
+MAX_HEADER_BYTES = int(os.getenv("MAIL_MAX_HEADER_BYTES", "65536"))
+
+
 def classify_header_spam(header_text: str) -> str:
     """
     이메일 헤더를 분석하여 SPF, DKIM 결과와 수신 경로 수를 확인하고,
     스팸 여부와 근거를 문자열로 반환합니다.
     """
+    # 이메일 헤더 영역만 파싱 (본문은 파싱하지 않음)
+    return classify_headers(HeaderParser().parsestr(header_text))
+
+
+def classify_headers(msg: Message) -> str:
+    """
+    파싱된 헤더 객체(email.message.Message)를 받아 classify_header_spam과 동일한
+    스팸 분석 보고서를 반환합니다. 원본 문자열 없이 헤더만으로 분석할 때 사용합니다.
+    """
     print("🔬 [Tool] classify_header_spam 실행")
+    return render_report(score_headers(msg))
+
+
+def parse_header_block(
+    raw_data: str, max_header_bytes: int = MAX_HEADER_BYTES
+) -> Message:
+    """
+    Base64 URL-safe로 인코딩된 원본 메시지에서 헤더 영역만 디코딩하여 파싱합니다.
+
+    전체 메시지를 디코딩하지 않고 앞부분 max_header_bytes 바이트만 디코딩한 뒤,
+    헤더와 본문을 구분하는 빈 줄에서 파싱을 멈춥니다. 따라서 메모리 사용량은
+    첨부파일을 포함한 메시지 크기가 아니라 헤더 크기에 비례합니다.
+    헤더가 상한을 넘는 경우, 상한 안의 마지막 완전한 줄까지만 파싱합니다.
+    """
+    # Base64 4문자 = 3바이트이므로, 상한 바이트만큼에 해당하는 앞부분만 디코딩
+    encoded = raw_data[: -(-max_header_bytes // 3) * 4]
+    encoded += "=" * (-len(encoded) % 4)
+    head = base64.urlsafe_b64decode(encoded)[:max_header_bytes]
+
+    # 헤더와 본문을 구분하는 첫 번째 빈 줄 (CRLF 또는 LF) 위치에서 자름
+    ends = [pos for pos in (head.find(b"\r\n\r\n"), head.find(b"\n\n")) if pos != -1]
+    if ends:
+        head = head[: min(ends)]
+    elif len(head) >= max_header_bytes:
+        head = head[: head.rfind(b"\n") + 1]
+
+    return HeaderParser().parsestr(head.decode("utf-8", errors="ignore"))
+
+
+def _headers_from_metadata(message: dict) -> Message:
+    """format='metadata' 응답의 payload.headers 목록을 헤더 객체로 변환합니다."""
+    msg = Message()
+    for header in message.get("payload", {}).get("headers", []):
+        msg[header["name"]] = header["value"]
+    return msg
+
+
+def _sender_domain(msg: Message) -> str:
+    """From 헤더의 발신 주소에서 도메인을 추출합니다."""
+    _, address = parseaddr(msg.get("From", ""))
+    return address.rpartition("@")[2].lower()
+
+
+def _analyze_messages(
+    msg_ids: list[str], fetched: dict[str, dict], fetch_mode: str
+) -> list[dict]:
+    """
+    조회한 메시지 묶음의 헤더를 파싱하고 규칙 엔진으로 한 번에 점수화하여,
+    메시지별 분석 결과를 입력 순서대로 반환합니다. 보고서 문자열은 이 단계에서만 생성합니다.
+    """
+    parsed: list[tuple[str, Message]] = []
+    results: dict[str, dict] = {}
+    for msg_id in msg_ids:
+        message = fetched[msg_id]
+        if "error" in message:
+            results[msg_id] = message
+        elif fetch_mode == "metadata":
+            parsed.append((msg_id, _headers_from_metadata(message)))
+        elif message.get("raw"):
+            # 헤더 영역만 한 번 파싱하여 제목 추출과 스팸 분석에 함께 사용합니다.
+            parsed.append((msg_id, parse_header_block(message["raw"])))
+        else:
+            results[msg_id] = {"id": msg_id, "error": "원본 데이터를 찾을 수 없습니다."}
+
+    verdicts = score_header_batch(msg for _, msg in parsed)
+    for (msg_id, msg), verdict in zip(parsed, verdicts, strict=True):
+        results[msg_id] = {
+            "id": msg_id,
+            "subject": msg.get("Subject", "제목 없음"),
+            "spam_analysis_report": render_report(verdict),
+            "spam_score": verdict.score,
+            "failed_checks": verdict.failed_mechanisms,
+            "sender_domain": _sender_domain(msg),
+            # 전체 원본 헤더는 보고서에 길어질 수 있으므로, 분석 결과만 반환합니다.
+        }
+    return [results[msg_id] for msg_id in msg_ids]
+
+
+def _count_verdicts(results: list[dict]) -> dict[str, int]:
+    """분석 결과 목록의 스팸 의심/오류 건수를 집계합니다."""
+    return {
+        "spam_count": sum(
+            1
+            for result in results
+            if result.get("spam_score", 0) >= SPAM_SCORE_THRESHOLD
+        ),
+        "error_count": sum(1 for result in results if "error" in result),
+    }
+
+
+def _internal_date_seconds(message: dict) -> int:
+    """Gmail 메시지의 internalDate(epoch 밀리초)를 epoch 초로 변환합니다."""
+    return int(message.get("internalDate", 0)) // 1000
+
+
+def _message_get_request(service, email: str, msg_id: str, format: str):
+    """조회 모드에 맞는 messages.get 요청 객체를 생성합니다."""
+    if format == "metadata":
+        return (
+            service.users()
+            .messages()
+            .get(
+                userId=email,
+                id=msg_id,
+                format="metadata",
+                metadataHeaders=SPAM_HEADER_NAMES,
+                fields="id,internalDate,payload/headers",
+            )
+        )
+    return service.users().messages().get(userId=email, id=msg_id, format=format)
+
+
+def _get_message_with_retry(service, email: str, msg_id: str, format: str) -> dict:
+    """Batch에서 실패한 메시지를 단건 요청으로 다시 조회합니다."""
+    try:
+        return _message_get_request(service, email, msg_id, format).execute(
+            num_retries=GMAIL_SINGLE_GET_RETRIES
+        )
+    except HttpError as error:
+        return {"id": msg_id, "error": f"API 오류: {error}"}
+
+
+def _batch_get_messages(
+    service,
+    email: str,
+    msg_ids: list[str],
+    format: str,
+    batch_size: int = GMAIL_BATCH_SIZE,
+) -> dict[str, dict]:
+    """
+    메시지 ID 목록을 batch_size 단위의 Gmail Batch HTTP 요청으로 묶어 조회합니다.
+
+    개별 항목 오류나 Batch 요청 자체의 실패는 단건 get 요청으로 재시도하며,
+    재시도 후에도 실패한 항목은 {"id", "error"} 형태로 반환합니다.
+
+    Returns:
+        dict: 메시지 ID를 키로 하는 Gmail 메시지 리소스(또는 오류) 사전.
+    """
+    fetched: dict[str, dict] = {}
+    failed_ids: list[str] = []
+
+    def _on_response(request_id: str, response: dict, exception: Exception) -> None:
+        if exception is not None:
+            failed_ids.append(request_id)
+        else:
+            fetched[request_id] = response
+
+    for start in range(0, len(msg_ids), batch_size):
+        chunk = msg_ids[start : start + batch_size]
+        batch = service.new_batch_http_request(callback=_on_response)
+        for msg_id in chunk:
+            batch.add(
+                _message_get_request(service, email, msg_id, format), request_id=msg_id
+            )
+        try:
+            batch.execute()
+        except HttpError as error:
+            # Batch 요청 전체가 실패한 경우, 응답을 받지 못한 항목을 모두 재시도 대상으로 처리
+            print(f"⚠️ [Batch] Batch 요청 실패, 단건 요청으로 재시도: {error}")
+            failed_ids.extend(
+                msg_id
+                for msg_id in chunk
+                if msg_id not in fetched and msg_id not in failed_ids
+            )
+
+    if failed_ids:
+        print(f"🔁 [Batch] 실패한 {len(failed_ids)}건을 단건 요청으로 재시도")
+    for msg_id in failed_ids:
+        fetched[msg_id] = _get_message_with_retry(service, email, msg_id, format)
+
+    return fetched
+
 
-    # 이메일 헤더 전문을 파싱
-    msg = message_from_string(header_text)
-    findings = []
+def _iter_message_id_chunks(
+    service,
+    email: str,
+    query_string: str,
+    chunk_size: int = GMAIL_BATCH_SIZE,
+    max_messages: int | None = None,
+) -> Iterator[list[str]]:
+    """
+    messages.list의 nextPageToken을 따라가며 메시지 ID를 chunk_size 단위로 전달합니다.
+
+    전체 ID 목록을 메모리에 올리지 않고 페이지 단위로 조회하므로, 조회 기간이
+    길어져도 메모리 사용량은 한 페이지 분량으로 유지됩니다.
+
+    Args:
+        chunk_size (int): 한 번에 전달할 메시지 ID 수 (Batch 요청 크기와 동일).
+        max_messages (int | None): 전체 조회 메시지 수 상한. None이면 제한 없음.
+    """
+    page_token = None
+    remaining = max_messages
+    chunk: list[str] = []
+
+    while remaining is None or remaining > 0:
+        page_size = GMAIL_LIST_PAGE_SIZE
+        if remaining is not None:
+            page_size = min(page_size, remaining)
+
+        results = (
+            service.users()
+            .messages()
+            .list(
+                userId=email,
+                q=query_string,
+                maxResults=page_size,
+                pageToken=page_token,
+                fields="messages/id,nextPageToken",
+            )
+            .execute()
+        )
+        page_ids = [msg_info["id"] for msg_info in results.get("messages", [])]
+        if remaining is not None:
+            page_ids = page_ids[:remaining]
+            remaining -= len(page_ids)
+
+        for msg_id in page_ids:
+            chunk.append(msg_id)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+    if chunk:
+        yield chunk
+
+
+def _iter_fetched_chunks(
+    credentials,
+    email: str,
+    query_string: str,
+    fetch_mode: str,
+    max_messages: int | None = None,
+    max_workers: int = GMAIL_FETCH_WORKERS,
+) -> Iterator[tuple[list[str], dict[str, dict]]]:
+    """
+    목록 조회 → Batch 조회 단계를 파이프라인으로 연결하여 (ID 묶음, 조회 결과)를 전달합니다.
+
+    목록 조회는 호출 스레드에서 진행하고, 각 ID 묶음의 Batch 조회는 스레드 풀에서
+    최대 max_workers개까지 동시에 진행합니다. googleapiclient의 Http 객체는 스레드에
+    안전하지 않으므로 워커 스레드마다 별도의 Gmail 서비스 객체를 생성합니다.
+    결과는 목록 조회 순서대로 전달되며, 호출 측의 분석 작업은 남은 묶음의 조회와
+    겹쳐서 진행됩니다.
+    """
+    list_service = get_service("gmail", "v1", credentials)
+
+    def _fetch(msg_ids: list[str]) -> dict[str, dict]:
+        # get_service는 스레드별로 서비스 객체를 보관하므로 워커마다 별도 객체를 사용
+        service = get_service("gmail", "v1", credentials)
+        return _batch_get_messages(service, email, msg_ids, format=fetch_mode)
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="gmail-fetch"
+    ) as executor:
+        in_flight = deque()
+        for msg_ids in _iter_message_id_chunks(
+            list_service, email, query_string, max_messages=max_messages
+        ):
+            in_flight.append((msg_ids, executor.submit(_fetch, msg_ids)))
+            if len(in_flight) >= max_workers:
+                done_ids, future = in_flight.popleft()
+                yield done_ids, future.result()
+
+        while in_flight:
+            done_ids, future = in_flight.popleft()
+            yield done_ids, future.result()
+
+
+def _date_range_to_epoch(start_date: str, end_date: str) -> tuple[int, int]:
+    """YYYY/MM/DD 형식의 조회 기간을 UTC 자정 기준 epoch 초 [start, end)로 변환합니다."""
+    start = datetime.strptime(start_date, "%Y/%m/%d").replace(tzinfo=timezone.utc)
+    end = datetime.strptime(end_date, "%Y/%m/%d").replace(tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _iter_analyzed_messages(
+    credentials,
+    email: str,
+    query_string: str,
+    fetch_mode: str,
+    max_messages: int | None = None,
+    progress: ProgressThrottle | None = None,
+) -> Iterator[tuple[dict, dict]]:
+    """조회 파이프라인의 각 메시지를 (분석 결과, Gmail 메시지 리소스) 순서쌍으로 전달합니다."""
+    for msg_ids, fetched in _iter_fetched_chunks(
+        credentials, email, query_string, fetch_mode, max_messages=max_messages
+    ):
+        results = _analyze_messages(msg_ids, fetched, fetch_mode)
+        if progress is not None:
+            progress.update(len(results), **_count_verdicts(results))
+        for msg_id, result in zip(msg_ids, results, strict=True):
+            yield result, fetched[msg_id]
+
+
+def _sync_mailbox_history(
+    credentials, store: MailAnalysisStore, mailbox: str, email: str, history_id: str
+) -> str | None:
+    """
+    users.history.list로 history_id 이후 변경된 메시지만 조회하여 저장소에 반영합니다.
 
-    # SPF 검사
-    auth_results = msg.get("Authentication-Results", "")
-    if "spf=fail" in auth_results.lower():
-        findings.append("SPF 검사 실패 (spf=fail): 의심 발신자 IP")
+    새로 추가된 메시지는 헤더를 조회하여 분석 후 저장하고, 삭제되었거나
+    스팸/휴지통으로 이동한 메시지는 저장소에서 제거합니다.
 
-    # DKIM 검사
-    if "dkim=fail" in auth_results.lower():
-        findings.append("DKIM 검사 실패 (dkim=fail): 헤더 변조 의심")
+    Returns:
+        str | None: 반영을 마친 최신 historyId. history_id가 만료된 경우 None.
+    """
+    service = get_service("gmail", "v1", credentials)
+
+    # 메시지 ID별 최종 변경 내용 (True: 분석 후 저장, False: 저장소에서 삭제)
+    changes: dict[str, bool] = {}
+    latest_history_id = history_id
+    page_token = None
+    while True:
+        try:
+            response = (
+                service.users()
+                .history()
+                .list(
+                    userId=email,
+                    startHistoryId=history_id,
+                    historyTypes=[
+                        "messageAdded",
+                        "messageDeleted",
+                        "labelAdded",
+                        "labelRemoved",
+                    ],
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+        except HttpError as error:
+            # historyId가 너무 오래되어 만료된 경우 404가 반환됩니다.
+            if error.resp.status == 404:
+                return None
+            raise
+
+        for record in response.get("history", []):
+            for item in record.get("messagesAdded", []):
+                labels = set(item["message"].get("labelIds", []))
+                changes[item["message"]["id"]] = not labels & EXCLUDED_LABELS
+            for item in record.get("messagesDeleted", []):
+                changes[item["message"]["id"]] = False
+            for item in record.get("labelsAdded", []):
+                if set(item.get("labelIds", [])) & EXCLUDED_LABELS:
+                    changes[item["message"]["id"]] = False
+            for item in record.get("labelsRemoved", []):
+                labels = set(item["message"].get("labelIds", []))
+                if set(item.get("labelIds", [])) & EXCLUDED_LABELS and not (
+                    labels & EXCLUDED_LABELS
+                ):
+                    changes[item["message"]["id"]] = True
+
+        latest_history_id = response.get("historyId", latest_history_id)
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+
+    added_ids = [msg_id for msg_id, added in changes.items() if added]
+    deleted_ids = [msg_id for msg_id, added in changes.items() if not added]
+    print(
+        f"🔄 [Sync] {mailbox}: 추가 {len(added_ids)}건, 삭제 {len(deleted_ids)}건 반영"
+    )
 
-    # DMARC 검사 (추가 검사)
-    if "dmarc=fail" in auth_results.lower():
-        findings.append("DMARC 검사 실패 (dmarc=fail): 정책 미준수")
+    if added_ids:
+        fetched = _batch_get_messages(service, email, added_ids, format="metadata")
+        results = _analyze_messages(added_ids, fetched, "metadata")
+        store.upsert_results(
+            mailbox,
+            [
+                (msg_id, _internal_date_seconds(fetched[msg_id]), result)
+                for msg_id, result in zip(added_ids, results, strict=True)
+                if "error" not in result
+            ],
+        )
+    if deleted_ids:
+        store.delete_messages(mailbox, deleted_ids)
+
+    return latest_history_id
+
+
+def _scan_with_store(
+    credentials,
+    store: MailAnalysisStore,
+    mailbox: str,
+    email: str,
+    start_ts: int,
+    end_ts: int,
+    max_messages: int | None = None,
+    progress: ProgressThrottle | None = None,
+) -> list[dict]:
+    """
+    저장소를 이용해 기간 내 분석 결과를 반환합니다.
 
-    # 수신 경로 개수 확인
-    received_count = len(msg.get_all("Received", []))
-    findings.append(f"Received 헤더 개수 (수신 경로): {received_count}개")
+    저장된 historyId 이후의 변경분을 먼저 반영한 뒤, 요청 기간이 이미 동기화된
+    기간에 포함되면 저장소에서 바로 응답하고, 그렇지 않으면 전체 조회 결과를
+    저장하여 다음 조회부터 저장소에서 응답할 수 있도록 합니다.
+    """
+    if store.discard_stale(mailbox):
+        print(f"♻️ [Store] {mailbox}: 분석 규칙이 바뀌어 저장된 결과를 다시 분석")
 
-    # 최종 판단 및 보고서 생성
-    if any("실패" in item for item in findings):
-        status = "🚨 스팸 가능성이 높은 메일로 판단됩니다."
+    history_id = store.get_history_id(mailbox)
+    if history_id:
+        synced_history_id = _sync_mailbox_history(
+            credentials, store, mailbox, email, history_id
+        )
+        if synced_history_id is None:
+            print(f"⚠️ [Sync] {mailbox}: historyId 만료, 저장소를 비우고 전체 조회")
+            store.clear(mailbox)
+        else:
+            store.set_history_id(mailbox, synced_history_id)
+        history_id = synced_history_id
+
+    if history_id and store.covers(mailbox, start_ts, end_ts):
+        print(f"💾 [Store] {mailbox}: 저장소에서 분석 결과 응답")
+        return store.query_range(mailbox, start_ts, end_ts, limit=max_messages)
+
+    if not history_id:
+        # 전체 조회 시작 전 시점의 historyId를 기록해 두어야 조회 중 도착한 메일도
+        # 다음 동기화에서 반영됩니다.
+        service = get_service("gmail", "v1", credentials)
+        history_id = service.users().getProfile(userId=email).execute()["historyId"]
+
+    query_string = f"after:{start_ts} before:{end_ts}"
+    analysis_results = []
+    pending_rows: list[tuple[str, int, dict]] = []
+    complete = True
+    for result, message in _iter_analyzed_messages(
+        credentials,
+        email,
+        query_string,
+        "metadata",
+        max_messages=max_messages,
+        progress=progress,
+    ):
+        analysis_results.append(result)
+        if "error" in result:
+            complete = False
+            continue
+        pending_rows.append((result["id"], _internal_date_seconds(message), result))
+        if len(pending_rows) >= GMAIL_LIST_PAGE_SIZE:
+            store.upsert_results(mailbox, pending_rows)
+            pending_rows = []
+    store.upsert_results(mailbox, pending_rows)
+    store.set_history_id(mailbox, history_id)
+
+    # 상한에 걸려 일부만 조회했거나 조회 실패한 메시지가 있으면 기간을 동기화 완료로 기록하지 않음
+    if complete and (max_messages is None or len(analysis_results) < max_messages):
+        store.add_range(mailbox, start_ts, end_ts)
+
+    return analysis_results
+
+
+def _scan_mailbox(
+    credentials,
+    mailbox: str,
+    email: str,
+    start_ts: int,
+    end_ts: int,
+    fetch_mode: str,
+    max_messages: int | None = None,
+) -> list[dict]:
+    """
+    메일함 하나의 [start_ts, end_ts) 기간 메시지를 분석하여 결과 목록을 반환합니다.
+    분석이 진행되는 동안 누적 건수를 A2A 진행 상황 이벤트로 전달합니다.
+    """
+    progress = ProgressThrottle(stage=f"mailbox:{mailbox}")
+
+    # 헤더 전용 모드에서는 저장소의 분석 결과와 historyId 변경분을 우선 사용
+    store = get_mail_store() if fetch_mode == "metadata" else None
+    if store is not None:
+        analysis_results = _scan_with_store(
+            credentials,
+            store,
+            mailbox,
+            email,
+            start_ts,
+            end_ts,
+            max_messages=max_messages,
+            progress=progress,
+        )
     else:
-        status = "✅ 스팸 징후가 없는 정상 메일로 판단됩니다."
+        # 페이지를 따라가며 ID 묶음 단위로 동시에 Batch 조회하고, 도착 순서대로 스팸 분석 수행
+        query_string = f"after:{start_ts} before:{end_ts}"
+        analysis_results = [
+            result
+            for result, _ in _iter_analyzed_messages(
+                credentials,
+                email,
+                query_string,
+                fetch_mode,
+                max_messages=max_messages,
+                progress=progress,
+            )
+        ]
 
-    report = "\n".join([status] + findings)
-    return report
+    progress.counts = {
+        "processed": len(analysis_results),
+        **_count_verdicts(analysis_results),
+    }
+    progress.flush(done=True)
+    return analysis_results
 
 
 def list_emails_and_get_raw_header(
-    admin_email: str, email: str, start_date: str, end_date: str
+    admin_email: str,
+    email: str,
+    start_date: str,
+    end_date: str,
+    max_messages: Optional[int] = None,
+    fetch_mode: str = "metadata",
+    output_mode: str = "aggregate",
+    tool_context: Optional[ToolContext] = None,
 ) -> dict:
     """
     Gmail API를 사용하여 특정 기간 내의 이메일 목록을 조회하고,
-    각 이메일의 전체 원본 헤더 전문을 추출하여 스팸 분석을 수행합니다.
+    각 이메일의 헤더를 추출하여 스팸 분석을 수행합니다.
 
     Args:
         email (str): 조회할 사용자의 이메일 주소 ('me' 또는 실제 이메일).
         start_date (str): 조회 시작 날짜 (YYYY/MM/DD 형식).
         end_date (str): 조회 종료 날짜 (YYYY/MM/DD 형식).
+        max_messages (int | None): 분석할 최대 메시지 수. 지정하지 않으면 기간 내 전체 메시지.
+        fetch_mode (str): 'metadata'(기본값)는 분석에 필요한 헤더만 조회하고,
+            'raw'는 첨부파일을 포함한 원본 MIME 전문을 조회합니다 (정밀 분석용).
+        output_mode (str): 'aggregate'(기본값)는 판정별/실패 항목별/발신 도메인별 집계와
+            상위 스팸 의심 메일만 크기 제한 안에서 반환하고, 상세 결과는 cursor로
+            get_mail_scan_details 툴에서 이어서 조회합니다. 'detail'은 메시지별
+            보고서 전체를 반환합니다.
 
     Returns:
-        dict: 조회 및 분석 결과 데이터 목록 또는 오류 메시지.
+        dict: 조회 및 분석 결과 (요약 또는 데이터 목록) 또는 오류 메시지.
     """
     print(
         f"🛠️ [Tool] list_emails_and_get_raw_header 실행 (기간: {start_date} ~ {end_date})"
     )
-    # read-only 권한만 필요
-    scopes = ["https://www.googleapis.com/auth/gmail.readonly"]
+    if fetch_mode not in FETCH_MODES:
+        return {
+            "success": False,
+            "error": f"지원하지 않는 fetch_mode입니다: {fetch_mode} (metadata 또는 raw)",
+        }
+    if output_mode not in OUTPUT_MODES:
+        return {
+            "success": False,
+            "error": f"지원하지 않는 output_mode입니다: {output_mode} (aggregate 또는 detail)",
+        }
 
     try:
-        credentials = get_delegated_credentials(admin_email=admin_email, scopes=scopes)
+        credentials = credential_cache.get(admin_email, GMAIL_SCOPES)
     except NameError:
         return {
             "success": False,
@@ -89,80 +649,73 @@ def list_emails_and_get_raw_header(
         return {"success": False, "error": "인증 실패"}
 
     try:
-        service = build("gmail", "v1", credentials=credentials)
-
-        # --- 내부 헬퍼 함수: 메시지 원본 내용 추출 ---
-        def get_raw_message(msg_id: str) -> dict:
-            """특정 이메일 ID의 원본 데이터를 추출합니다."""
-
-            # format='raw'를 사용하여 이메일의 전체 원본 MIME 메시지를 가져옵니다.
-            message = (
-                service.users()
-                .messages()
-                .get(userId=email, id=msg_id, format="raw")
-                .execute()
-            )
-
-            # 원본 데이터는 Base64 URL-safe로 인코딩되어 있습니다.
-            raw_data = message.get("raw")
-            if not raw_data:
-                return {"id": msg_id, "error": "원본 데이터를 찾을 수 없습니다."}
-
-            # Base64 디코딩하여 원본 텍스트(헤더 + 본문)를 가져옵니다.
-            # 스팸 분석 함수는 이 전체 텍스트에서 헤더만 추출하여 사용합니다.
-            raw_text = base64.urlsafe_b64decode(raw_data).decode(
-                "utf-8", errors="ignore"
-            )
-
-            # 메일의 제목을 빠르게 추출 (분석 결과와 함께 보여주기 위함)
-            # 전체 텍스트에서 'Subject' 헤더만 파싱
-            msg_parser = message_from_string(raw_text)
-            subject = msg_parser.get("Subject", "제목 없음")
-
-            # 스팸 분석 함수 호출
-            spam_report = classify_header_spam(raw_text)
-
-            return {
-                "id": msg_id,
-                "subject": subject,
-                "spam_analysis_report": spam_report,
-                # 전체 원본 헤더는 보고서에 길어질 수 있으므로, 분석 결과만 반환합니다.
-                # 'raw_header_full': raw_text
-            }
-
-        # ---------------------------------------------------
-
-        # 1. 메시지 ID 목록 조회
-        query_string = f"after:{start_date} before:{end_date}"
-        print(f"🔍 [Query] {query_string}")
+        start_ts, end_ts = _date_range_to_epoch(start_date, end_date)
+    except ValueError:
+        return {
+            "success": False,
+            "error": "날짜 형식이 올바르지 않습니다. YYYY/MM/DD 형식으로 입력하세요.",
+        }
 
-        # format='metadata'를 사용하여 목록 조회 시 오버헤드 최소화
-        results = (
-            service.users().messages().list(userId=email, q=query_string).execute()
+    try:
+        # 1. 메시지 ID 목록 조회 (저장소와 같은 기준을 쓰도록 UTC 자정 기준 epoch 초 사용)
+        query_string = f"after:{start_ts} before:{end_ts}"
+        print(f"🔍 [Query] {query_string} ({start_date} ~ {end_date})")
+
+        # 2. 저장소 또는 조회 파이프라인을 통해 기간 내 메시지 분석
+        mailbox = (admin_email if email == "me" else email).lower()
+        analysis_results = _scan_mailbox(
+            credentials,
+            mailbox,
+            email,
+            start_ts,
+            end_ts,
+            fetch_mode,
+            max_messages=max_messages,
         )
-        message_ids = results.get("messages", [])
 
-        if not message_ids:
+        if not analysis_results:
             return {
                 "success": True,
                 "data": [],
                 "message": f"{query_string} 조건에 해당하는 이메일이 없습니다.",
             }
 
-        # 2. 각 ID에 대해 원본 데이터 조회 및 스팸 분석 수행
-        analysis_results = []
-        for msg_info in message_ids:
-            analysis_results.append(get_raw_message(msg_info["id"]))
-
+        if output_mode == "aggregate":
+            return {
+                "success": True,
+                "summary": build_aggregate_report(
+                    analysis_results,
+                    SPAM_SCORE_THRESHOLD,
+                    owner=result_owner(tool_context),
+                ),
+            }
         return {"success": True, "data": analysis_results}
 
     except HttpError as error:
         return {"success": False, "error": f"API 오류: {error}"}
 
 
+def get_mail_scan_details(cursor: str, tool_context: ToolContext) -> dict:
+    """
+    메일 조회 결과의 cursor 위치부터 상세 결과를 이어서 조회합니다.
+    메일 조회 요약의 cursor는 메시지별 상세 분석 결과(스팸 의심 메일이 점수순으로
+    먼저)를, 도메인 전체 조회의 users_cursor는 사용자별 결과를 반환합니다.
+    응답 크기 제한으로 남은 결과가 있으면 next_cursor를 함께 반환합니다.
+
+    Args:
+        cursor (str): 이전 응답의 cursor, users_cursor 또는 next_cursor 값.
+
+    Returns:
+        dict: 상세 결과 목록과 next_cursor 또는 오류 메시지.
+    """
+    print(f"🛠️ [Tool] get_mail_scan_details 실행 (cursor: {cursor})")
+    return get_page(cursor, owner=result_owner(tool_context))
+
+
 # 하루전에 발생한 이메일들을 조회하고 헤더를 총 분석하는 함수
+# 저장소가 활성화되어 있으면 반복 호출 시 historyId 변경분만 조회합니다.
 def list_yesterdays_emails_and_get_raw_header(admin_email: str, email: str) -> dict:
-    from datetime import datetime, timedelta
+    from datetime import timedelta
 
     today = datetime.utcnow().date()
     yesterday = today - timedelta(days=1)
@@ -176,3 +729,168 @@ def list_yesterdays_emails_and_get_raw_header(admin_email: str, email: str) -> d
         start_date=start_date,
         end_date=end_date,
     )
+
+
+def _iter_domain_user_emails(admin_email: str, domain: str) -> Iterator[str]:
+    """Admin Directory API로 도메인의 활성 사용자 기본 이메일을 페이지 단위로 조회합니다."""
+    credentials = credential_cache.get(admin_email, DIRECTORY_SCOPES)
+    if not credentials:
+        raise RuntimeError("인증 실패 (Admin Directory API)")
+
+    service = get_service("admin", "directory_v1", credentials)
+    page_token = None
+    while True:
+        results = (
+            service.users()
+            .list(
+                domain=domain,
+                query="isSuspended=false",
+                maxResults=500,
+                orderBy="email",
+                pageToken=page_token,
+                fields="nextPageToken,users(primaryEmail)",
+            )
+            .execute()
+        )
+        for user in results.get("users", []):
+            yield user["primaryEmail"]
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+
+def _scan_user_mailbox(
+    admin_email: str,
+    user_email: str,
+    start_ts: int,
+    end_ts: int,
+    max_messages: int | None = None,
+) -> dict:
+    """
+    사용자 본인으로 위임된 자격 증명으로 메일함 하나를 분석하고 요약을 반환합니다.
+    오류는 예외로 전파하지 않고 해당 사용자의 결과에 기록합니다.
+    """
+    try:
+        credentials = credential_cache.get(
+            admin_email, GMAIL_SCOPES, subject=user_email
+        )
+        if not credentials:
+            return {"email": user_email, "success": False, "error": "인증 실패"}
+
+        analysis_results = _scan_mailbox(
+            credentials,
+            user_email.lower(),
+            user_email,
+            start_ts,
+            end_ts,
+            "metadata",
+            max_messages=max_messages,
+        )
+    except Exception as error:
+        return {"email": user_email, "success": False, "error": str(error)}
+
+    suspicious = [
+        {"email": user_email, **result}
+        for result in analysis_results
+        if result.get("spam_score", 0) >= SPAM_SCORE_THRESHOLD
+    ]
+    return {
+        "email": user_email,
+        "success": True,
+        "message_count": len(analysis_results),
+        "spam_count": len(suspicious),
+        "error_count": sum(1 for result in analysis_results if "error" in result),
+        "suspicious_messages": suspicious,
+    }
+
+
+def scan_domain_mailboxes(
+    admin_email: str,
+    domain: str,
+    start_date: str,
+    end_date: str,
+    max_users: Optional[int] = None,
+    max_messages_per_user: Optional[int] = None,
+    tool_context: Optional[ToolContext] = None,
+) -> dict:
+    """
+    Google Workspace 도메인 전체 사용자의 메일함을 병렬로 조회하여 스팸 분석 결과를
+    하나의 보고서로 집계합니다.
+
+    Args:
+        admin_email (str): 사용자 목록 조회 권한이 있는 Google Workspace 관리자 이메일.
+        domain (str): 조회할 Google Workspace 도메인 (예: example.com).
+        start_date (str): 조회 시작 날짜 (YYYY/MM/DD 형식).
+        end_date (str): 조회 종료 날짜 (YYYY/MM/DD 형식).
+        max_users (int | None): 조회할 최대 사용자 수. 지정하지 않으면 도메인 전체.
+        max_messages_per_user (int | None): 사용자별 분석할 최대 메시지 수.
+
+    Returns:
+        dict: 전체 집계, 스팸 의심 메일이 많은 사용자/실패한 사용자, 스팸 의심 메일
+            첫 페이지와 이어서 조회할 cursor 또는 오류 메시지.
+    """
+    print(
+        f"🛠️ [Tool] scan_domain_mailboxes 실행 (Domain: {domain}, 기간: {start_date} ~ {end_date})"
+    )
+    try:
+        start_ts, end_ts = _date_range_to_epoch(start_date, end_date)
+    except ValueError:
+        return {
+            "success": False,
+            "error": "날짜 형식이 올바르지 않습니다. YYYY/MM/DD 형식으로 입력하세요.",
+        }
+
+    try:
+        user_emails = list(
+            islice(_iter_domain_user_emails(admin_email, domain), max_users)
+        )
+    except Exception as error:
+        return {"success": False, "error": f"사용자 목록 조회 오류: {error}"}
+
+    if not user_emails:
+        return {
+            "success": True,
+            "data": [],
+            "message": f"{domain} 도메인에서 조회된 사용자가 없습니다.",
+        }
+
+    # 사용자별 메일함 조회를 워커 풀로 분산하고, 완료되는 순서대로 진행 상황을 기록
+    user_results: dict[str, dict] = {}
+    progress = ProgressThrottle(stage=f"domain:{domain}")
+    with ThreadPoolExecutor(
+        max_workers=DOMAIN_SCAN_WORKERS, thread_name_prefix="domain-scan"
+    ) as executor:
+        futures = {
+            executor.submit(
+                _scan_user_mailbox,
+                admin_email,
+                user_email,
+                start_ts,
+                end_ts,
+                max_messages=max_messages_per_user,
+            ): user_email
+            for user_email in user_emails
+        }
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            user_result = future.result()
+            user_results[futures[future]] = user_result
+            status = (
+                f"{user_result['message_count']}건 분석, 스팸 의심 {user_result['spam_count']}건"
+                if user_result["success"]
+                else f"실패 ({user_result['error']})"
+            )
+            print(
+                f"📬 [Domain] ({done_count}/{len(user_emails)}) {user_result['email']}: {status}"
+            )
+            progress.update(
+                failed_user_count=0 if user_result["success"] else 1,
+                message_count=user_result.get("message_count", 0),
+                spam_count=user_result.get("spam_count", 0),
+            )
+    progress.flush(done=True)
+
+    # 사용자 목록 순서대로 결과를 정리하고, 크기 제한 안에서 집계와 상위 결과만 반환
+    return build_domain_report(
+        [user_results[user_email] for user_email in user_emails],
+        owner=result_owner(tool_context),
+    )
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 import os
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -19,30 +20,37 @@ from contextlib import asynccontextmanager
 import google.auth
 from a2a.server.apps import A2AFastAPIApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard
 from a2a.utils.constants import (
     AGENT_CARD_WELL_KNOWN_PATH,
     EXTENDED_AGENT_CARD_PATH,
 )
 from fastapi import FastAPI
-from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from google.adk.artifacts.gcs_artifact_service import GcsArtifactService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.cloud import logging as google_cloud_logging
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider, export
 
 from app.agent import app as adk_app
 from app.app_utils.gcs import create_bucket_if_not_exists
+from app.app_utils.progress import ProgressA2aAgentExecutor
+from app.app_utils.session_store import (
+    PendingDiscardingRunner,
+    create_session_service,
+    is_persistent,
+)
+from app.app_utils.task_store import create_task_store
 from app.app_utils.tracing import CloudTraceLoggingSpanExporter
 from app.app_utils.typing import Feedback
+from app.mail_report import scan_result_store
+from app.mail_tools import credential_cache
 
 _, project_id = google.auth.default()
 logging_client = google_cloud_logging.Client()
 logger = logging_client.logger(__name__)
+# 서버 실행 관련 경고용 로거 (logger는 Cloud Logging 구조화 로그용)
+server_logger = logging.getLogger(__name__)
 
 # bucket_name = f"gs://{project_id}-mail-agent-logs"
 # create_bucket_if_not_exists(
@@ -54,16 +62,40 @@ logger = logging_client.logger(__name__)
 # provider.add_span_processor(processor)
 # trace.set_tracer_provider(provider)
 
-runner = Runner(
+# uvicorn 워커 프로세스 수. 2 이상은 unshared_state_settings()의 모든 공유 저장소
+# 설정이 필요하며, 하나라도 없으면 워커 1개로 실행합니다.
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+
+session_service = create_session_service()
+
+runner = PendingDiscardingRunner(
     app=adk_app,
     # artifact_service=GcsArtifactService(bucket_name=bucket_name),
-    session_service=InMemorySessionService(),
+    session_service=session_service,
 )
 
+task_store = create_task_store()
+
 request_handler = DefaultRequestHandler(
-    agent_executor=A2aAgentExecutor(runner=runner), task_store=InMemoryTaskStore()
+    agent_executor=ProgressA2aAgentExecutor(runner=runner),
+    task_store=task_store,
 )
 
+
+def unshared_state_settings() -> list[str]:
+    """
+    여러 워커가 같은 상태를 보려면 필요한 공유 저장소 설정 중 비어 있는 것의 목록입니다.
+    (세션, A2A 작업, 메일 스캔 결과 커서)
+    """
+    shared = {
+        "SESSION_DB_URL": is_persistent(session_service),
+        # DB가 있으면 진행 중 작업은 항상 DB에서 읽으므로 다른 워커의 갱신도 보임
+        "TASK_STORE_DB_URL": task_store.durable,
+        "MAIL_SCAN_RESULT_DB_PATH": scan_result_store.shared,
+    }
+    return [name for name, is_shared in shared.items() if not is_shared]
+
+
 A2A_RPC_PATH = f"/a2a/{adk_app.name}"
 
 
@@ -113,8 +145,38 @@ def collect_feedback(feedback: Feedback) -> dict[str, str]:
     return {"status": "success"}
 
 
+@app.get("/stats")
+def get_stats() -> dict[str, dict]:
+    """Expose in-process cache statistics.
+
+    Returns:
+        Hit/miss and refresh counters of the delegated credential cache, A2A task
+        store gauges, plus session event batching and DB pool counters when
+        sessions are persistent
+    """
+    return {
+        "credentials": credential_cache.stats(),
+        "tasks": task_store.stats(),
+        "sessions": session_service.stats() if is_persistent(session_service) else {},
+    }
+
+
 # Main execution
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    workers = SERVER_WORKERS
+    unshared = unshared_state_settings()
+    if workers > 1 and unshared:
+        server_logger.warning(
+            f"⚠️ {', '.join(unshared)} 설정 없이 여러 워커를 실행할 수 없어 "
+            "워커 1개로 실행합니다."
+        )
+        workers = 1
+    # 워커가 여러 개면 각 프로세스가 앱을 다시 import하도록 import 문자열로 전달
+    uvicorn.run(
+        "app.server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8002,
+        workers=workers,
+    )
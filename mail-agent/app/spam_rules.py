@@ -0,0 +1,114 @@
+import hashlib
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from email.message import Message
+
+# 인증 결과 헤더. 수신 서버가 추가한 Authentication-Results를 우선 사용하고,
+# 해당 헤더에 없는 메커니즘은 ARC-Authentication-Results에서 보완합니다.
+AUTH_RESULT_HEADERS = ("Authentication-Results", "ARC-Authentication-Results")
+AUTH_MECHANISMS = ("spf", "dkim", "dmarc")
+
+# 스팸 판정 기준 점수. 매칭된 규칙 점수의 합이 이 값 이상이면 스팸으로 판정합니다.
+SPAM_SCORE_THRESHOLD = 1.0
+
+# 'spf=pass', 'dkim = fail' 형태의 메커니즘 결과를 한 번에 추출
+_AUTH_RESULT_PATTERN = re.compile(
+    r"\b(" + "|".join(AUTH_MECHANISMS) + r")\s*=\s*([a-z]+)", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class SpamRule:
+    """인증 메커니즘 결과 하나에 대한 스팸 판정 규칙."""
+
+    mechanism: str
+    result: str
+    score: float
+    finding: str
+
+
+# 규칙은 데이터로 선언하고, 모듈 로드 시 (메커니즘, 결과) 조회 테이블로 컴파일합니다.
+SPAM_RULES = (
+    SpamRule("spf", "fail", 1.0, "SPF 검사 실패 (spf=fail): 의심 발신자 IP"),
+    SpamRule("dkim", "fail", 1.0, "DKIM 검사 실패 (dkim=fail): 헤더 변조 의심"),
+    SpamRule("dmarc", "fail", 1.0, "DMARC 검사 실패 (dmarc=fail): 정책 미준수"),
+)
+
+# 규칙이나 기준 점수가 바뀌면 값이 바뀌어, 저장된 이전 분석 결과를 다시 분석하게 합니다.
+RULES_VERSION = hashlib.sha256(
+    repr((SPAM_RULES, SPAM_SCORE_THRESHOLD)).encode("utf-8")
+).hexdigest()[:12]
+
+_COMPILED_RULES: dict[tuple[str, str], SpamRule] = {
+    (rule.mechanism, rule.result): rule for rule in SPAM_RULES
+}
+
+
+@dataclass
+class HeaderVerdict:
+    """헤더 한 세트에 대한 구조화된 분석 결과."""
+
+    # 메커니즘별 인증 결과 집합 (예: {"spf": {"pass"}, "dkim": {"pass", "fail"}})
+    auth_results: dict[str, set[str]] = field(default_factory=dict)
+    matched_rules: list[SpamRule] = field(default_factory=list)
+    received_count: int = 0
+    score: float = 0.0
+
+    @property
+    def is_spam(self) -> bool:
+        return self.score >= SPAM_SCORE_THRESHOLD
+
+    @property
+    def failed_mechanisms(self) -> list[str]:
+        return [rule.mechanism for rule in self.matched_rules]
+
+
+def parse_auth_results(msg: Message) -> dict[str, set[str]]:
+    """인증 결과 헤더를 한 번씩만 훑어 메커니즘별 결과 집합으로 변환합니다."""
+    auth_results: dict[str, set[str]] = {}
+    for header_name in AUTH_RESULT_HEADERS:
+        # 첫 번째 헤더(가장 마지막 수신 홉)만 사용 (기존 msg.get 동작과 동일)
+        header_value = msg.get(header_name)
+        if not header_value:
+            continue
+        found: dict[str, set[str]] = {}
+        for mechanism, result in _AUTH_RESULT_PATTERN.findall(header_value):
+            found.setdefault(mechanism.lower(), set()).add(result.lower())
+        for mechanism, results in found.items():
+            auth_results.setdefault(mechanism, results)
+    return auth_results
+
+
+def score_headers(msg: Message) -> HeaderVerdict:
+    """파싱된 헤더 객체 하나를 규칙에 따라 점수화합니다."""
+    auth_results = parse_auth_results(msg)
+    matched_rules = [
+        _COMPILED_RULES[(mechanism, result)]
+        for mechanism in AUTH_MECHANISMS
+        for result in sorted(auth_results.get(mechanism, ()))
+        if (mechanism, result) in _COMPILED_RULES
+    ]
+    return HeaderVerdict(
+        auth_results=auth_results,
+        matched_rules=matched_rules,
+        received_count=len(msg.get_all("Received", [])),
+        score=sum(rule.score for rule in matched_rules),
+    )
+
+
+def score_header_batch(messages: Iterable[Message]) -> list[HeaderVerdict]:
+    """여러 헤더 세트를 한 번에 점수화합니다 (입력 순서 유지)."""
+    return [score_headers(msg) for msg in messages]
+
+
+def render_report(verdict: HeaderVerdict) -> str:
+    """분석 결과를 사용자에게 보여줄 보고서 문자열로 변환합니다."""
+    if verdict.is_spam:
+        status = "🚨 스팸 가능성이 높은 메일로 판단됩니다."
+    else:
+        status = "✅ 스팸 징후가 없는 정상 메일로 판단됩니다."
+
+    findings = [rule.finding for rule in verdict.matched_rules]
+    findings.append(f"Received 헤더 개수 (수신 경로): {verdict.received_count}개")
+    return "\n".join([status, *findings])
@@ -0,0 +1,121 @@
+"""
+공용 HTTP 전송(app_utils/http_transport.py 또는 app/utils/http_transport.py)의
+연결 재사용과 기본 timeout을 로컬 HTTP 서버로 측정합니다.
+
+사용법 (저장소 루트에서):
+    uv run --project mail-agent python scripts/bench_http_transport.py mail-agent
+"""
+
+import argparse
+import importlib.util
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import google_auth_httplib2
+import httplib2
+import requests
+from google.oauth2.credentials import Credentials
+
+TRANSPORT_PATHS = ("app/app_utils/http_transport.py", "app/utils/http_transport.py")
+# 기본 timeout 확인용 지연 응답 시간(초) (측정 시 HTTP_TIMEOUT_SECONDS보다 길어야 함)
+SLOW_RESPONSE_SECONDS = 3.0
+
+_connections = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        global _connections
+        _connections += 1
+        super().setup()
+
+    def do_GET(self) -> None:
+        if self.path == "/slow":
+            time.sleep(SLOW_RESPONSE_SECONDS)
+        # 헤더와 본문을 한 번에 보내야 Nagle/지연 ACK로 인한 지연이 측정에 섞이지 않음
+        self.wfile.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: 2\r\n\r\n{}"
+        )
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _load_transport(agent_dir: Path):
+    for relative in TRANSPORT_PATHS:
+        path = agent_dir / relative
+        if path.exists():
+            spec = importlib.util.spec_from_file_location("http_transport", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    sys.exit(f"{agent_dir}에서 http_transport.py를 찾을 수 없습니다.")
+
+
+def _bench(name: str, call, count: int) -> None:
+    global _connections
+    _connections = 0
+    started = time.perf_counter()
+    for _ in range(count):
+        call()
+    elapsed_ms = (time.perf_counter() - started) / count * 1000
+    print(f"{name}: {count}회, 연결 {_connections}개, {elapsed_ms:.2f} ms/회")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("agent_dir", type=Path, help="측정할 에이전트 폴더")
+    parser.add_argument("-n", "--count", type=int, default=200, help="요청 횟수")
+    args = parser.parse_args()
+
+    transport = _load_transport(args.agent_dir)
+    server = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    credentials = Credentials(token="bench")
+
+    _bench(
+        "httplib2: 요청마다 새 전송 객체",
+        lambda: google_auth_httplib2.AuthorizedHttp(
+            credentials, http=httplib2.Http()
+        ).request(url),
+        args.count,
+    )
+    _bench(
+        "httplib2: authorized_http (스레드별 공용 연결)",
+        lambda: transport.authorized_http(credentials).request(url),
+        args.count,
+    )
+    _bench("requests: 요청마다 requests.get", lambda: requests.get(url), args.count)
+    _bench(
+        "requests: get_requests_session (공용 연결 풀)",
+        lambda: transport.get_requests_session().get(url),
+        args.count,
+    )
+
+    # timeout 없이 보낸 요청도 HTTP_TIMEOUT_SECONDS 안에 끝나는지 확인
+    started = time.perf_counter()
+    try:
+        transport.get_requests_session().get(url + "slow")
+        outcome = "응답 수신"
+    except requests.Timeout:
+        outcome = "timeout"
+    print(
+        f"기본 timeout (HTTP_TIMEOUT_SECONDS={transport.HTTP_TIMEOUT_SECONDS:g}): "
+        f"{outcome}, {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
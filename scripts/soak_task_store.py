@@ -0,0 +1,218 @@
+"""
+A2A 작업 저장소(app_utils/task_store.py 또는 app/utils/task_store.py)의 제거(LRU/TTL)
+동작을 확인하고, 작업을 계속 쌓을 때의 메모리 사용량을 InMemoryTaskStore와 비교합니다.
+
+사용법 (저장소 루트에서):
+    uv run --project mail-agent python scripts/soak_task_store.py mail-agent
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    Artifact,
+    Message,
+    Part,
+    Role,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+TASK_STORE_PATHS = ("app/app_utils/task_store.py", "app/utils/task_store.py")
+# 제거 동작 확인에 사용하는 작은 설정값
+CHECK_MAX_COMPLETED = 10
+CHECK_TTL_SECONDS = 0.2
+
+
+def _load_task_store(agent_dir: Path):
+    for relative in TASK_STORE_PATHS:
+        path = agent_dir / relative
+        if path.exists():
+            spec = importlib.util.spec_from_file_location("task_store", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    sys.exit(f"{agent_dir}에서 task_store.py를 찾을 수 없습니다.")
+
+
+def _rss_mb() -> float:
+    """현재 RSS(MB). /proc이 없으면 최대 RSS를 사용합니다."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _task(index: int, state: TaskState) -> Task:
+    task = Task(
+        id=f"task-{index}",
+        context_id=f"context-{index}",
+        status=TaskStatus(state=state),
+        history=[
+            Message(
+                message_id=f"message-{index}",
+                role=Role.user,
+                parts=[Part(root=TextPart(text="정지된 사용자 목록 " * 5))],
+            )
+        ],
+    )
+    if state == TaskState.completed:
+        task.artifacts = [
+            Artifact(
+                artifact_id=f"artifact-{index}",
+                parts=[Part(root=TextPart(text="결과 " * 50))],
+            )
+        ]
+    return task
+
+
+async def _run_lifecycle(store, index: int) -> None:
+    """요청 하나의 작업 흐름 (submitted → working → completed) 후 조회합니다."""
+    await store.save(_task(index, TaskState.submitted))
+    await store.save(_task(index, TaskState.working))
+    await store.save(_task(index, TaskState.completed))
+    assert await store.get(f"task-{index}") is not None
+
+
+def _check(name: str, ok: bool, detail: object) -> bool:
+    print(f"{'✅' if ok else '❌'} {name}: {detail}")
+    return ok
+
+
+async def _check_eviction(task_store) -> bool:
+    """크기 상한(LRU), TTL, 진행 중 작업 보존, DB 조회(다른 워커 포함)를 확인합니다."""
+    results = []
+
+    store = task_store.BoundedTaskStore(
+        max_completed=CHECK_MAX_COMPLETED, ttl_seconds=600
+    )
+    await store.save(_task(-1, TaskState.working))
+    for index in range(CHECK_MAX_COMPLETED * 5):
+        await _run_lifecycle(store, index)
+    stats = store.stats()
+    results.append(
+        _check(
+            "LRU 상한",
+            stats["live_completed"] == CHECK_MAX_COMPLETED
+            and stats["evicted_lru"] == CHECK_MAX_COMPLETED * 4
+            and await store.get("task-0") is None,
+            stats,
+        )
+    )
+    results.append(
+        _check(
+            "진행 중 작업 보존",
+            await store.get("task--1") is not None and stats["live_active"] == 1,
+            f"live_active={stats['live_active']}",
+        )
+    )
+
+    store = task_store.BoundedTaskStore(ttl_seconds=CHECK_TTL_SECONDS)
+    await _run_lifecycle(store, 0)
+    await asyncio.sleep(CHECK_TTL_SECONDS * 1.5)
+    expired = await store.get("task-0") is None
+    await _run_lifecycle(store, 1)
+    stats = store.stats()
+    results.append(
+        _check(
+            "TTL 만료",
+            expired and stats["evicted_ttl"] == 1 and stats["live_completed"] == 1,
+            stats,
+        )
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = task_store.BoundedTaskStore(
+            max_completed=1, ttl_seconds=600, db_url=f"sqlite:///{directory}/tasks.db"
+        )
+        await _run_lifecycle(store, 0)
+        await _run_lifecycle(store, 1)
+        task = await store.get("task-0")
+        stats = store.stats()
+        results.append(
+            _check(
+                "제거된 작업 DB 조회",
+                task is not None
+                and task.status.state == TaskState.completed
+                and stats["db_reads"] == 1,
+                stats,
+            )
+        )
+
+        # 같은 DB를 쓰는 두 워커: B가 진행 중일 때 읽은 작업을 A가 완료하면 B도 완료로 봄
+        db_url = f"sqlite:///{directory}/shared.db"
+        worker_a = task_store.BoundedTaskStore(db_url=db_url)
+        worker_b = task_store.BoundedTaskStore(db_url=db_url)
+        await worker_a.save(_task(0, TaskState.working))
+        seen_working = await worker_b.get("task-0")
+        await worker_a.save(_task(0, TaskState.completed))
+        seen_completed = await worker_b.get("task-0")
+        results.append(
+            _check(
+                "다른 워커가 완료한 작업 조회",
+                seen_working is not None
+                and seen_working.status.state == TaskState.working
+                and seen_completed is not None
+                and seen_completed.status.state == TaskState.completed,
+                worker_b.stats(),
+            )
+        )
+    return all(results)
+
+
+async def _soak(name: str, store, count: int) -> float:
+    started_rss = _rss_mb()
+    started = time.perf_counter()
+    for index in range(count):
+        await _run_lifecycle(store, index)
+        if (index + 1) % max(count // 5, 1) == 0:
+            print(
+                f"  {name}: {index + 1}개, RSS {_rss_mb():.0f}MB, "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+    return _rss_mb() - started_rss
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("agent_dir", type=Path, help="측정할 에이전트 폴더")
+    parser.add_argument(
+        "-n", "--count", type=int, default=50000, help="쌓을 작업 수 (soak)"
+    )
+    args = parser.parse_args()
+
+    task_store = _load_task_store(args.agent_dir)
+    ok = await _check_eviction(task_store)
+
+    # 제한 없는 저장소가 늘린 메모리가 측정에 섞이지 않도록 BoundedTaskStore부터 실행
+    bounded = task_store.BoundedTaskStore()
+    bounded_growth = await _soak("BoundedTaskStore", bounded, args.count)
+    stats = bounded.stats()
+    ok &= _check(
+        "soak 후 메모리 보관 작업 수",
+        stats["live_completed"] <= bounded.max_completed and stats["live_active"] == 0,
+        stats,
+    )
+    unbounded_growth = await _soak("InMemoryTaskStore", InMemoryTaskStore(), args.count)
+    print(
+        f"RSS 증가: BoundedTaskStore {bounded_growth:.0f}MB, "
+        f"InMemoryTaskStore {unbounded_growth:.0f}MB"
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
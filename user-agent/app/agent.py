@@ -15,7 +15,12 @@
 from google.adk.agents import Agent
 from google.adk.apps.app import App
 
-from .user_tools import get_google_workspace_users, format_and_mask_user_data
+from .user_tools import (
+    format_and_mask_user_data,
+    get_google_workspace_users,
+    get_user_list_page,
+    lookup_workspace_users,
+)
 
 # root_agent 정의
 root_agent = Agent(
@@ -33,8 +38,15 @@ root_agent = Agent(
     2. 조회 도메인 (domain): (사용자를 조회할 Google Workspace 도메인 이름, 예: example.com)
     
     모든 인자가 확보된 후에만 툴을 호출하고, 결과를 바탕으로 사용자 목록을 친절하게 요약하여 보고하세요.
+    조직 단위(org_unit_path), 이름 접두사처럼 조회 조건이 있는 질문은 'get_google_workspace_users'에
+    해당 필터 인자를 지정하여 조건에 맞는 사용자만 조회하세요.
+    특정 사용자(이메일/별칭), 이메일 접두사, 관리자 여부, 정지 여부처럼 일부 사용자만 묻는 질문에는
+    전체 목록 대신 'lookup_workspace_users' 툴을 사용하여 조건에 맞는 사용자만 조회하세요.
+    조회 결과는 전체 집계(summary)와 첫 페이지만 전달됩니다. 사용자가 나머지 목록을 원하면
+    응답의 next_cursor로 'get_user_list_page' 툴을 호출하여 다음 페이지를 조회하세요.
+    최근 조회 결과는 캐시에서 반환됩니다. 사용자가 "최신 정보", "다시 조회" 등을 명시적으로 요청한 경우에만 refresh=True로 호출하세요.
     """,
-    tools=[get_google_workspace_users],
+    tools=[get_google_workspace_users, lookup_workspace_users, get_user_list_page],
     after_tool_callback=format_and_mask_user_data,
 )
 
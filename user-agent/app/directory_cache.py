@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+# 디렉터리 스냅샷을 네트워크 확인 없이 그대로 사용하는 시간(초)
+DIRECTORY_CACHE_TTL_SECONDS = float(os.getenv("DIRECTORY_CACHE_TTL_SECONDS", "300"))
+# 스냅샷을 재시작 후에도 유지할 SQLite 파일 경로. 비어 있으면 메모리에만 보관합니다.
+DIRECTORY_CACHE_PATH = os.getenv("DIRECTORY_CACHE_PATH", "")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directory_snapshots (
+    admin_email TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    pages TEXT NOT NULL,
+    PRIMARY KEY (admin_email, domain)
+);
+"""
+
+CacheKey = tuple[str, str]
+
+
+@dataclass
+class DirectoryPage:
+    """Directory API 사용자 목록의 한 페이지와 재검증에 사용할 ETag."""
+
+    page_token: str | None
+    etag: str | None
+    next_page_token: str | None
+    users: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class DirectorySnapshot:
+    """도메인 전체 사용자 목록 스냅샷 (페이지 순서 유지)."""
+
+    pages: list[DirectoryPage]
+    fetched_at: float = field(default_factory=time.time)
+    # 조회용 인덱스 (directory_index.get_index가 처음 사용할 때 생성)
+    index: Any = field(default=None, repr=False, compare=False)
+
+    def iter_users(self) -> Iterator[dict]:
+        for page in self.pages:
+            yield from page.users
+
+    @property
+    def user_count(self) -> int:
+        return sum(len(page.users) for page in self.pages)
+
+
+def _cache_key(admin_email: str, domain: str) -> CacheKey:
+    return admin_email.lower(), domain.lower()
+
+
+class DirectoryCache:
+    """
+    (관리자 이메일, 도메인)별 디렉터리 스냅샷 캐시입니다.
+
+    TTL 이내의 스냅샷은 네트워크 없이 그대로 사용하고, TTL이 지나면 호출 측에서
+    페이지별 ETag(If-None-Match)로 재검증한 뒤 put으로 갱신합니다. path를 지정하면
+    스냅샷을 SQLite 파일에도 저장하여 재시작 후에도 재검증부터 시작할 수 있습니다.
+    이때는 SQLite 파일이 기준이 되어, 조회할 때마다 파일의 fetched_at과 메모리 사본을
+    비교하므로 같은 파일을 쓰는 다른 워커의 갱신/무효화도 바로 반영됩니다.
+    """
+
+    def __init__(
+        self, ttl_seconds: float = DIRECTORY_CACHE_TTL_SECONDS, path: str = ""
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: dict[CacheKey, DirectorySnapshot] = {}
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "refetched": 0,
+            "restarted": 0,
+        }
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    @property
+    def shared(self) -> bool:
+        """여러 워커 프로세스가 같은 스냅샷(및 무효화)을 보는지 여부."""
+        return self._conn is not None
+
+    def get(self, admin_email: str, domain: str) -> DirectorySnapshot | None:
+        """나이와 관계없이 보관 중인 스냅샷을 반환합니다. 없으면 None."""
+        key = _cache_key(admin_email, domain)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if self._conn is None:
+                return snapshot
+            row = self._conn.execute(
+                "SELECT fetched_at FROM directory_snapshots "
+                "WHERE admin_email = ? AND domain = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                # 다른 워커에서 무효화된 스냅샷은 메모리 사본도 버림
+                self._snapshots.pop(key, None)
+                return None
+            if snapshot is None or snapshot.fetched_at != row[0]:
+                snapshot = self._load(key)
+                if snapshot is not None:
+                    self._snapshots[key] = snapshot
+            return snapshot
+
+    def is_fresh(self, snapshot: DirectorySnapshot) -> bool:
+        return time.time() - snapshot.fetched_at < self.ttl_seconds
+
+    def put(self, admin_email: str, domain: str, snapshot: DirectorySnapshot) -> None:
+        key = _cache_key(admin_email, domain)
+        with self._lock:
+            self._snapshots[key] = snapshot
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO directory_snapshots "
+                        "(admin_email, domain, fetched_at, pages) VALUES (?, ?, ?, ?)",
+                        (
+                            *key,
+                            snapshot.fetched_at,
+                            json.dumps([asdict(page) for page in snapshot.pages]),
+                        ),
+                    )
+
+    def invalidate(
+        self, admin_email: str | None = None, domain: str | None = None
+    ) -> int:
+        """
+        조건에 맞는 스냅샷을 삭제하고 삭제한 개수를 반환합니다.
+        인자를 모두 생략하면 전체를 삭제합니다.
+        """
+        admin_email = admin_email.lower() if admin_email else None
+        domain = domain.lower() if domain else None
+        with self._lock:
+            keys = [
+                key
+                for key in self._snapshots
+                if admin_email in (None, key[0]) and domain in (None, key[1])
+            ]
+            for key in keys:
+                del self._snapshots[key]
+            if self._conn is not None:
+                with self._conn:
+                    cursor = self._conn.execute(
+                        "DELETE FROM directory_snapshots "
+                        "WHERE (? IS NULL OR admin_email = ?) "
+                        "AND (? IS NULL OR domain = ?)",
+                        (admin_email, admin_email, domain, domain),
+                    )
+                return max(len(keys), cursor.rowcount)
+            return len(keys)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {**self._stats, "size": len(self._snapshots), "shared": self.shared}
+
+    def _load(self, key: CacheKey) -> DirectorySnapshot | None:
+        row = self._conn.execute(
+            "SELECT fetched_at, pages FROM directory_snapshots "
+            "WHERE admin_email = ? AND domain = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        fetched_at, pages = row
+        return DirectorySnapshot(
+            pages=[DirectoryPage(**page) for page in json.loads(pages)],
+            fetched_at=fetched_at,
+        )
+
+
+directory_cache = DirectoryCache(path=DIRECTORY_CACHE_PATH)
@@ -0,0 +1,84 @@
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+
+from .directory_cache import DirectorySnapshot
+
+# 접두사 검색 상한 계산용 문자 (이메일에 나올 수 있는 어떤 문자보다 큼)
+_PREFIX_END = "\uffff"
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    """비트셋에서 켜진 비트의 위치를 오름차순으로 전달합니다."""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class DirectoryIndex:
+    """
+    디렉터리 스냅샷 위의 조회용 인덱스입니다.
+
+    - 사용자는 기본 이메일(소문자) 순으로 정렬된 위치(0..n-1)로 식별합니다.
+    - by_email / by_alias: 이메일·별칭 → 위치 해시 맵
+    - emails: 정렬된 이메일 목록 (bisect로 접두사 검색)
+    - admin_bits / suspended_bits: 관리자·정지 사용자의 위치를 켠 정수 비트셋
+    """
+
+    def __init__(self, users: Iterable[dict]) -> None:
+        self.users = sorted(
+            users, key=lambda user: user.get("primaryEmail", "").lower()
+        )
+        self.emails = [user.get("primaryEmail", "").lower() for user in self.users]
+        self.by_email: dict[str, int] = {}
+        self.by_alias: dict[str, int] = {}
+        self.admin_bits = 0
+        self.suspended_bits = 0
+        for position, user in enumerate(self.users):
+            self.by_email[self.emails[position]] = position
+            for alias in user.get("aliases") or []:
+                self.by_alias[alias.lower()] = position
+            if user.get("isAdmin"):
+                self.admin_bits |= 1 << position
+            if user.get("suspended"):
+                self.suspended_bits |= 1 << position
+        self.all_bits = (1 << len(self.users)) - 1
+
+    def find(self, address: str) -> dict | None:
+        """기본 이메일 또는 별칭으로 사용자 한 명을 찾습니다."""
+        address = address.lower()
+        position = self.by_email.get(address, self.by_alias.get(address))
+        return None if position is None else self.users[position]
+
+    def prefix_bits(self, prefix: str) -> int:
+        """이메일이 prefix로 시작하는 사용자의 비트셋 (정렬 순서상 연속 구간)."""
+        prefix = prefix.lower()
+        start = bisect_left(self.emails, prefix)
+        end = bisect_left(self.emails, prefix + _PREFIX_END, lo=start)
+        return (1 << end) - (1 << start)
+
+    def match_bits(
+        self,
+        prefix: str | None = None,
+        is_admin: bool | None = None,
+        suspended: bool | None = None,
+    ) -> int:
+        """조건을 모두 만족하는 사용자의 비트셋. None인 조건은 무시합니다."""
+        mask = self.all_bits if prefix is None else self.prefix_bits(prefix)
+        if is_admin is not None:
+            mask &= self.admin_bits if is_admin else ~self.admin_bits
+        if suspended is not None:
+            mask &= self.suspended_bits if suspended else ~self.suspended_bits
+        return mask & self.all_bits
+
+    def iter_users(self, mask: int) -> Iterator[dict]:
+        """비트셋에 포함된 사용자를 이메일 순으로 전달합니다."""
+        for position in _iter_bits(mask):
+            yield self.users[position]
+
+
+def get_index(snapshot: DirectorySnapshot) -> DirectoryIndex:
+    """스냅샷의 인덱스를 반환합니다. 스냅샷당 처음 한 번만 생성합니다."""
+    if snapshot.index is None:
+        snapshot.index = DirectoryIndex(snapshot.iter_users())
+    return snapshot.index
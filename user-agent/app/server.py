@@ -19,24 +19,31 @@ from contextlib import asynccontextmanager
 import google.auth
 from a2a.server.apps import A2AFastAPIApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard
 from a2a.utils.constants import (
     AGENT_CARD_WELL_KNOWN_PATH,
     EXTENDED_AGENT_CARD_PATH,
 )
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from google.adk.artifacts.gcs_artifact_service import GcsArtifactService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.cloud import logging as google_cloud_logging
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider, export
 
 from app.agent import app as adk_app
+from app.directory_cache import directory_cache
+from app.user_report import user_result_store
+from app.user_tools import credential_cache
+from app.utils.admin_auth import require_admin_token
 from app.utils.gcs import create_bucket_if_not_exists
+from app.utils.session_store import (
+    PendingDiscardingRunner,
+    create_session_service,
+    is_persistent,
+)
+from app.utils.task_store import create_task_store
 from app.utils.tracing import CloudTraceLoggingSpanExporter
 from app.utils.typing import Feedback
 
@@ -71,15 +78,37 @@ dotenv.load_dotenv()
 
 A2A_RPC_PATH = f"/a2a/{adk_app.name}"
 
-runner = Runner(app=adk_app, session_service=InMemorySessionService())
+# uvicorn 워커 프로세스 수. 2 이상은 unshared_state_settings()의 모든 공유 저장소
+# 설정이 필요하며, 하나라도 없으면 워커 1개로 실행합니다.
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+
+session_service = create_session_service()
+runner = PendingDiscardingRunner(app=adk_app, session_service=session_service)
 
 custom_executor = A2aAgentExecutor(runner=runner)
 
+task_store = create_task_store()
+
 request_handler = DefaultRequestHandler(
-    agent_executor=custom_executor, task_store=InMemoryTaskStore()
+    agent_executor=custom_executor, task_store=task_store
 )
 
 
+def unshared_state_settings() -> list[str]:
+    """
+    여러 워커가 같은 상태를 보려면 필요한 공유 저장소 설정 중 비어 있는 것의 목록입니다.
+    (세션, A2A 작업, 사용자 목록 커서, 디렉터리 캐시와 그 무효화)
+    """
+    shared = {
+        "SESSION_DB_URL": is_persistent(session_service),
+        # DB가 있으면 진행 중 작업은 항상 DB에서 읽으므로 다른 워커의 갱신도 보임
+        "TASK_STORE_DB_URL": task_store.durable,
+        "USER_RESULT_DB_PATH": user_result_store.shared,
+        "DIRECTORY_CACHE_PATH": directory_cache.shared,
+    }
+    return [name for name, is_shared in shared.items() if not is_shared]
+
+
 async def build_dynamic_agent_card() -> AgentCard:
     """Builds the Agent Card dynamically from the root_agent."""
     try:
@@ -179,9 +208,61 @@ async def debug_middleware(request, call_next):
     return response
 
 
+@app.get("/stats")
+def get_stats() -> dict[str, dict]:
+    """Expose in-process cache statistics.
+
+    Returns:
+        Hit/miss and refresh counters of the delegated credential and directory
+        caches, A2A task store gauges, plus session event batching and DB pool
+        counters when sessions are persistent
+    """
+    return {
+        "credentials": credential_cache.stats(),
+        "directory": directory_cache.stats(),
+        "tasks": task_store.stats(),
+        "sessions": session_service.stats() if is_persistent(session_service) else {},
+    }
+
+
+@app.post("/directory-cache/invalidate", dependencies=[Depends(require_admin_token)])
+def invalidate_directory_cache(
+    admin_email: str | None = None, domain: str | None = None
+) -> dict[str, int]:
+    """Drop cached directory snapshots so the next listing refetches them.
+
+    Requires ``Authorization: Bearer <ADMIN_API_TOKEN>``. With DIRECTORY_CACHE_PATH
+    set the snapshots are deleted from the shared SQLite file, and every worker
+    drops its in-memory copy on its next read.
+
+    Args:
+        admin_email: Only drop snapshots listed by this admin
+        domain: Only drop snapshots of this domain
+
+    Returns:
+        Number of snapshots removed
+    """
+    return {"invalidated": directory_cache.invalidate(admin_email, domain)}
+
+
 # Main execution
 if __name__ == "__main__":
     import uvicorn
 
-    # log_level="debug"를 추가하여 상세 디버그 로그 출력 가능
-    uvicorn.run(app, host="0.0.0.0", port=8001, log_level="debug")
+    workers = SERVER_WORKERS
+    unshared = unshared_state_settings()
+    if workers > 1 and unshared:
+        logger.warning(
+            f"⚠️ {', '.join(unshared)} 설정 없이 여러 워커를 실행할 수 없어 "
+            "워커 1개로 실행합니다."
+        )
+        workers = 1
+    # 워커가 여러 개면 각 프로세스가 앱을 다시 import하도록 import 문자열로 전달
+    uvicorn.run(
+        "app.server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8001,
+        workers=workers,
+        # log_level="debug"를 추가하여 상세 디버그 로그 출력 가능
+        log_level="debug",
+    )
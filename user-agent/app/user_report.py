@@ -0,0 +1,132 @@
+import json
+import os
+
+from .utils.result_store import PagedResultStore
+
+# LLM에 전달하는 콜백 응답 한 번의 최대 크기 (UTF-8 바이트, 대략 바이트/3 ≈ 토큰)
+OUTPUT_BYTE_BUDGET = int(os.getenv("USER_OUTPUT_BYTE_BUDGET", "8000"))
+# 커서로 이어서 조회할 수 있도록 보관하는 최근 조회 결과 수 (워커 프로세스별 메모리)
+USER_RESULT_CACHE_SIZE = int(os.getenv("USER_RESULT_CACHE_SIZE", "32"))
+# 커서를 발급한 뒤 이어서 조회할 수 있는 시간(초)
+USER_RESULT_TTL_SECONDS = float(os.getenv("USER_RESULT_TTL_SECONDS", "3600"))
+# 조회 결과를 워커 프로세스 간에 공유할 SQLite 파일 경로. 비어 있으면 메모리에만
+# 보관하므로 커서는 발급한 워커에서만 이어서 조회할 수 있습니다.
+USER_RESULT_DB_PATH = os.getenv("USER_RESULT_DB_PATH", "")
+
+user_result_store = PagedResultStore(
+    USER_RESULT_CACHE_SIZE, USER_RESULT_TTL_SECONDS, path=USER_RESULT_DB_PATH
+)
+
+
+def _encoded_size(value: object) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def save_user_results(owner: str, rows: list[dict]) -> str:
+    """조회 결과를 owner(대화)에 묶어 보관하고 result_id를 반환합니다."""
+    return user_result_store.save(owner, rows)
+
+
+def load_user_results(owner: str, cursor: str) -> tuple[str, list[dict], int]:
+    """
+    cursor("<result_id>:<offset>")에 해당하는 보관 결과를 반환합니다. 잘못되었거나
+    만료되었거나 다른 대화(owner)에서 발급된 cursor면 ValueError를 발생시킵니다.
+    """
+    try:
+        result_id, offset_text = cursor.rsplit(":", 1)
+        offset = int(offset_text)
+    except ValueError:
+        raise ValueError(f"잘못된 cursor입니다: {cursor}") from None
+
+    rows = user_result_store.load(owner, result_id)
+    if rows is None:
+        raise ValueError("조회 결과가 만료되었습니다. 사용자 조회를 다시 실행하세요.")
+    return result_id, rows, offset
+
+
+def mask_email(email: str) -> str:
+    """이메일 로컬 파트를 앞 3글자만 남기고 마스킹합니다."""
+    local_part, at, domain_part = email.rpartition("@")
+    if not at:
+        return email
+    return f"{local_part[:3]}***@{domain_part}"
+
+
+def format_user(user: dict) -> dict:
+    """LLM에 전달할 최종 포맷으로 사용자 한 명의 데이터를 정리합니다."""
+    is_admin = user.get("isAdmin", False)
+    return {
+        "email": user.get("primaryEmail", "N/A"),
+        "별칭_aliases": ", ".join(user.get("aliases", []) or []),
+        "역할_isAdmin": "관리자" if is_admin else "일반 사용자",
+        "상태_status": "정지됨" if user.get("suspended") else "활성",
+    }
+
+
+def _summary_line(user: dict) -> str:
+    return (
+        f"이메일: {mask_email(user.get('email', 'N/A'))} "
+        f"| 별칭: {user.get('별칭_aliases') or '없음'} "
+        f"| 역할: {user.get('역할_isAdmin', '일반')} | 상태: {user.get('상태_status')}"
+    )
+
+
+def build_user_page(
+    rows: list[dict],
+    result_id: str,
+    offset: int = 0,
+    byte_budget: int = OUTPUT_BYTE_BUDGET,
+) -> dict:
+    """
+    Directory API 사용자 목록(rows)을 한 번 순회하면서, offset부터 byte_budget 안에
+    들어가는 사용자만 포맷/마스킹하여 요약 줄로 채우고, 남은 행이 있으면 next_cursor를
+    반환합니다. 첫 페이지(offset=0)에는 전체 집계(관리자/정지/별칭 수)를 함께 포함합니다.
+    """
+    page: list[str] = []
+    used = _encoded_size(
+        {
+            "user_count": len(rows),
+            "user_summary_list": [],
+            "next_cursor": f"{result_id}:{len(rows)}",
+            "success": True,
+        }
+    )
+    include_summary = offset == 0
+    if include_summary:
+        # 집계 필드는 고정 크기에 가까우므로 대략적인 크기를 미리 차감
+        used += 200
+    summary = {"admins": 0, "suspended": 0, "users_with_aliases": 0, "aliases": 0}
+    page_full = False
+    next_offset = len(rows)
+
+    for position, user in enumerate(rows):
+        if include_summary:
+            aliases = user.get("aliases") or []
+            summary["admins"] += user.get("isAdmin") is True
+            summary["suspended"] += bool(user.get("suspended"))
+            if aliases:
+                summary["users_with_aliases"] += 1
+                summary["aliases"] += len(aliases)
+        elif page_full:
+            break
+        if position < offset or page_full:
+            continue
+
+        line = _summary_line(format_user(user))
+        line_size = _encoded_size(line) + 2
+        # 예산을 넘더라도 최소 한 건은 반환하여 진행이 멈추지 않도록 함
+        if page and used + line_size > byte_budget:
+            page_full = True
+            next_offset = position
+            continue
+        page.append(line)
+        used += line_size
+
+    report: dict = {"user_count": len(rows)}
+    if include_summary:
+        report["summary"] = summary
+    report["user_summary_list"] = page
+    report["next_cursor"] = (
+        f"{result_id}:{next_offset}" if next_offset < len(rows) else None
+    )
+    return report
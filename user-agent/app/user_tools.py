@@ -1,12 +1,13 @@
 import json
 import os
 import sys
-from typing import Optional, Any, Dict
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from google.genai import types
-from google.adk.agents.callback_context import CallbackContext
+from collections.abc import Iterator
+from itertools import islice
+from typing import Any, Dict, Optional
+
 from google.adk.tools.base_tool import BaseTool, ToolContext
+from google.genai import types
+from googleapiclient.errors import HttpError
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -20,67 +21,323 @@ except ModuleNotFoundError:
     )
     from auth import get_delegated_credentials
 
+from .directory_cache import (
+    DirectoryPage,
+    DirectorySnapshot,
+    directory_cache,
+)
+from .directory_index import get_index
+from .user_report import build_user_page, load_user_results, save_user_results
+from .utils.credentials import DelegatedCredentialCache
+from .utils.google_services import get_service
+from .utils.result_store import result_owner
+
+# 위임 자격 증명은 프로세스 전역 캐시에서 재사용하고, 만료 전에 백그라운드에서 갱신
+credential_cache = DelegatedCredentialCache(mint=get_delegated_credentials)
+
+DIRECTORY_SCOPES = ["https://www.googleapis.com/auth/admin.directory.user.readonly"]
+AUTH_ERROR_MESSAGE = "인증 실패 (Admin Email 또는 서비스 계정 파일 문제)"
+# lookup_workspace_users가 기본으로 반환하는 최대 사용자 수
+LOOKUP_RESULT_LIMIT = 50
+# Directory API 한 페이지당 최대 사용자 수 (API 허용 최대값)
+DIRECTORY_PAGE_SIZE = 500
+# 포맷터가 사용하는 필드만 요청하여 응답 크기를 줄임
+DIRECTORY_USER_FIELDS = "primaryEmail,aliases,isAdmin,suspended"
 
 # --------------------------
 # 1. 툴 함수: 데이터 조회 및 정리 (get_google_workspace_users)
 # --------------------------
 
 
-def get_google_workspace_users(admin_email: str, domain: str) -> dict:
-    """Google Admin SDK를 사용하여 특정 도메인의 사용자 목록을 조회합니다."""
-    print(
-        f"🛠️ [Tool] get_google_workspace_users 실행 (Admin: {admin_email}, Domain: {domain})"
+def _build_directory_query(
+    is_admin: Optional[bool] = None,
+    is_suspended: Optional[bool] = None,
+    org_unit_path: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+) -> str | None:
+    """구조화된 필터를 Directory API의 query 문자열로 변환합니다. 필터가 없으면 None."""
+    clauses = []
+    if is_admin is not None:
+        clauses.append(f"isAdmin={str(is_admin).lower()}")
+    if is_suspended is not None:
+        clauses.append(f"isSuspended={str(is_suspended).lower()}")
+    if org_unit_path:
+        escaped = org_unit_path.replace("'", "\\'")
+        clauses.append(f"orgUnitPath='{escaped}'")
+    if email_prefix:
+        clauses.append(f"email:{email_prefix}*")
+    if name_prefix:
+        # 이름 접두사 검색은 givenName 필드만 지원됨
+        clauses.append(f"givenName:{name_prefix}*")
+    return " ".join(clauses) or None
+
+
+class _ExpiredPageTokenError(Exception):
+    """이전 목록에서 재사용한 nextPageToken을 Directory API가 거부했습니다."""
+
+
+def _iter_directory_pages(
+    service,
+    domain: str,
+    previous: DirectorySnapshot | None = None,
+    query: str | None = None,
+    customer: str | None = None,
+) -> Iterator[DirectoryPage]:
+    """
+    nextPageToken을 따라가며 도메인의 사용자 목록을 한 페이지씩 조회합니다.
+
+    previous 스냅샷에 같은 위치의 페이지가 있으면 ETag를 If-None-Match로 보내고,
+    304 Not Modified 응답이면 본문 없이 이전 페이지를 그대로 재사용합니다.
+    재사용한 페이지의 nextPageToken이 만료되어 다음 요청이 실패하면
+    _ExpiredPageTokenError를 발생시킵니다.
+    query를 지정하면 Directory API가 조건에 맞는 사용자만 반환하며, customer를
+    지정하면 도메인 대신 고객 계정(예: my_customer)의 전체 도메인을 조회합니다.
+    """
+    scope = {"customer": customer} if customer else {"domain": domain}
+    if query:
+        scope["query"] = query
+    previous_pages = (
+        {page.page_token: page for page in previous.pages} if previous else {}
     )
-    scopes = ["https://www.googleapis.com/auth/admin.directory.user.readonly"]
+    page_token = None
+    # page_token이 304로 재사용한 이전 페이지에서 온 것인지 여부
+    reused_token = False
+    while True:
+        request = service.users().list(
+            **scope,
+            maxResults=DIRECTORY_PAGE_SIZE,
+            orderBy="email",
+            fields=f"etag,nextPageToken,users({DIRECTORY_USER_FIELDS})",
+            pageToken=page_token,
+        )
+        cached_page = previous_pages.get(page_token)
+        if cached_page is not None and cached_page.etag:
+            request.headers["If-None-Match"] = cached_page.etag
 
-    credentials = get_delegated_credentials(admin_email, scopes)
+        try:
+            results = request.execute()
+            page = DirectoryPage(
+                page_token=page_token,
+                etag=results.get("etag"),
+                next_page_token=results.get("nextPageToken"),
+                users=results.get("users", []),
+            )
+        except HttpError as error:
+            if error.resp.status == 304 and cached_page is not None:
+                page = cached_page
+            elif reused_token:
+                raise _ExpiredPageTokenError(page_token) from error
+            else:
+                raise
+
+        yield page
+        page_token = page.next_page_token
+        reused_token = page is cached_page
+        if not page_token:
+            return
 
-    if not credentials:
-        return {
-            "success": False,
-            "error": "인증 실패 (Admin Email 또는 서비스 계정 파일 문제)",
-        }
 
+def _load_directory(
+    service, admin_email: str, domain: str, refresh: bool = False
+) -> DirectorySnapshot:
+    """
+    캐시된 디렉터리 스냅샷을 반환합니다. TTL이 지났거나 refresh가 지정되면
+    ETag로 재검증하고, 변경된 페이지만 다시 받아 스냅샷을 갱신합니다.
+    """
+    previous = directory_cache.get(admin_email, domain)
+    if previous is not None and not refresh and directory_cache.is_fresh(previous):
+        directory_cache.count("hits")
+        return previous
+
+    directory_cache.count("misses")
     try:
-        service = build("admin", "directory_v1", credentials=credentials)
-        results = (
-            service.users()
-            .list(
-                domain=domain,
-                maxResults=100,
-                orderBy="email",
-                projection="full",  # 👈 추가: 사용자 객체의 모든 필드를 반환하도록 요청
-            )
-            .execute()
+        pages = list(_iter_directory_pages(service, domain, previous))
+    except _ExpiredPageTokenError:
+        # 이전 목록의 페이지 토큰이 만료되면 ETag 없이 처음부터 다시 조회
+        directory_cache.count("restarted")
+        pages = list(_iter_directory_pages(service, domain))
+    if previous is not None:
+        previous_ids = {id(page) for page in previous.pages}
+        unchanged = all(id(page) in previous_ids for page in pages)
+        directory_cache.count("revalidated" if unchanged else "refetched")
+    snapshot = DirectorySnapshot(pages=pages)
+    directory_cache.put(admin_email, domain, snapshot)
+    return snapshot
+
+
+def _get_directory_snapshot(
+    admin_email: str, domain: str, refresh: bool = False
+) -> DirectorySnapshot | None:
+    """위임 자격 증명으로 디렉터리 스냅샷을 가져옵니다. 인증에 실패하면 None."""
+    credentials = credential_cache.get(admin_email, DIRECTORY_SCOPES)
+    if not credentials:
+        return None
+    service = get_service("admin", "directory_v1", credentials)
+    return _load_directory(service, admin_email, domain, refresh=refresh)
+
+
+def _iter_filtered_users(
+    admin_email: str,
+    domain: str,
+    query: str | None,
+    customer: str | None,
+    has_aliases: Optional[bool],
+) -> Iterator[dict] | None:
+    """
+    서버 측 query로 좁힌 사용자 목록을 페이지 단위로 받아오면서, API가 표현하지
+    못하는 조건(has_aliases)을 한 번의 순회로 적용합니다. 인증에 실패하면 None.
+    """
+    credentials = credential_cache.get(admin_email, DIRECTORY_SCOPES)
+    if not credentials:
+        return None
+    service = get_service("admin", "directory_v1", credentials)
+    users = (
+        user
+        for page in _iter_directory_pages(
+            service, domain, query=query, customer=customer
         )
-        users = results.get("users", [])
-
-        # LLM에 전달할 최종 포맷으로 데이터 정리 (JSON 리스트)
-        formatted_users = []
-        for user in users:
-            is_admin = user.get("isAdmin", False)
-
-            formatted_users.append(
-                {
-                    "email": user.get("primaryEmail", "N/A"),
-                    # aliases 필드는 "full" projection으로 반환될 가능성이 높습니다.
-                    "별칭_aliases": ", ".join(user.get("aliases", []) or []),
-                    "역할_isAdmin": "관리자" if is_admin else "일반 사용자",
-                    "상태_status": "정지됨" if user.get("suspended") else "활성",
-                }
+        for user in page.users
+    )
+    if has_aliases is None:
+        return users
+    return (user for user in users if bool(user.get("aliases")) == has_aliases)
+
+
+def get_google_workspace_users(
+    admin_email: str,
+    domain: str,
+    refresh: bool = False,
+    is_admin: Optional[bool] = None,
+    is_suspended: Optional[bool] = None,
+    org_unit_path: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    has_aliases: Optional[bool] = None,
+    customer: Optional[str] = None,
+    tool_context: Optional[ToolContext] = None,
+) -> dict:
+    """
+    Google Admin SDK를 사용하여 특정 도메인의 사용자 목록을 조회합니다.
+
+    필터 없이 호출하면 같은 관리자/도메인의 최근 조회 결과를 캐시에서 바로 반환합니다.
+    사용자가 최신 정보를 명시적으로 요청한 경우에만 refresh=True로 호출하세요.
+    필터를 지정하면 Directory API가 조건에 맞는 사용자만 반환하도록 요청합니다.
+
+    Args:
+        admin_email: 권한 위임을 위한 관리자 이메일.
+        domain: 조회할 도메인.
+        refresh: 캐시를 무시하고 최신 목록을 확인할지 여부.
+        is_admin: True면 슈퍼 관리자만, False면 슈퍼 관리자가 아닌 사용자만.
+        is_suspended: True면 정지된 사용자만, False면 활성 사용자만.
+        org_unit_path: 조직 단위 경로 (예: "/Sales").
+        email_prefix: 이메일 앞부분 (예: "alice").
+        name_prefix: 이름(givenName) 앞부분.
+        has_aliases: True면 별칭이 있는 사용자만, False면 별칭이 없는 사용자만.
+        customer: 도메인 대신 고객 계정 전체를 조회할 때의 고객 ID (예: "my_customer").
+    """
+    print(
+        f"🛠️ [Tool] get_google_workspace_users 실행 (Admin: {admin_email}, Domain: {domain})"
+    )
+    query = _build_directory_query(
+        is_admin=is_admin,
+        is_suspended=is_suspended,
+        org_unit_path=org_unit_path,
+        email_prefix=email_prefix,
+        name_prefix=name_prefix,
+    )
+    try:
+        if query is None and has_aliases is None and not customer:
+            snapshot = _get_directory_snapshot(admin_email, domain, refresh=refresh)
+            users = None if snapshot is None else snapshot.iter_users()
+        else:
+            print(f"🔎 [Directory] 서버 측 필터 적용: {query}")
+            users = _iter_filtered_users(
+                admin_email, domain, query, customer, has_aliases
             )
+        if users is None:
+            return {"success": False, "error": AUTH_ERROR_MESSAGE}
+        # 포맷/마스킹은 콜백이 페이지에 들어가는 사용자에 대해서만 수행하므로, 여기서는
+        # 스냅샷의 사용자 객체를 복사하지 않고 그대로 보관한 뒤 cursor만 반환
+        result_id = save_user_results(result_owner(tool_context), list(users))
+        return {"success": True, "cursor": f"{result_id}:0"}
+
+    except HttpError as error:
+        return {"success": False, "error": f"API 오류: {error}"}
+
 
-        return {"success": True, "data": formatted_users}
+def lookup_workspace_users(
+    admin_email: str,
+    domain: str,
+    email: Optional[str] = None,
+    prefix: Optional[str] = None,
+    is_admin: Optional[bool] = None,
+    suspended: Optional[bool] = None,
+    limit: int = LOOKUP_RESULT_LIMIT,
+    tool_context: Optional[ToolContext] = None,
+) -> dict:
+    """
+    캐시된 디렉터리 인덱스에서 조건에 맞는 사용자만 찾아 반환합니다.
 
+    Args:
+        admin_email: 권한 위임을 위한 관리자 이메일.
+        domain: 조회할 도메인.
+        email: 기본 이메일 또는 별칭. 지정하면 해당 계정 한 명만 찾습니다.
+        prefix: 이메일 앞부분 (예: "alice"는 alice로 시작하는 계정).
+        is_admin: True면 관리자만, False면 일반 사용자만.
+        suspended: True면 정지된 사용자만, False면 활성 사용자만.
+        limit: 반환할 최대 사용자 수. 전체 일치 수는 total_matches로 반환합니다.
+    """
+    print(
+        f"🛠️ [Tool] lookup_workspace_users 실행 (Domain: {domain}, email={email}, "
+        f"prefix={prefix}, is_admin={is_admin}, suspended={suspended})"
+    )
+    try:
+        snapshot = _get_directory_snapshot(admin_email, domain)
+        if snapshot is None:
+            return {"success": False, "error": AUTH_ERROR_MESSAGE}
     except HttpError as error:
         return {"success": False, "error": f"API 오류: {error}"}
 
+    index = get_index(snapshot)
+    if email:
+        user = index.find(email)
+        matches = [] if user is None else [user]
+        total_matches = len(matches)
+    else:
+        mask = index.match_bits(prefix=prefix, is_admin=is_admin, suspended=suspended)
+        matches = islice(index.iter_users(mask), limit)
+        total_matches = mask.bit_count()
+
+    result_id = save_user_results(result_owner(tool_context), list(matches))
+    return {
+        "success": True,
+        "cursor": f"{result_id}:0",
+        "total_matches": total_matches,
+    }
+
 
 # --------------------------
 # 2. 콜백 함수: LLM 컨텍스트 정리 (보안 및 포맷팅)
 # --------------------------
 
 
+def get_user_list_page(cursor: str, tool_context: Optional[ToolContext] = None) -> dict:
+    """
+    이전 사용자 조회 결과의 다음 페이지를 반환합니다.
+
+    Args:
+        cursor: 직전 응답의 next_cursor 값.
+    """
+    print(f"🛠️ [Tool] get_user_list_page 실행 (cursor: {cursor})")
+    try:
+        load_user_results(result_owner(tool_context), cursor)
+    except ValueError as error:
+        return {"success": False, "error": str(error)}
+    # 마스킹/페이지 구성은 format_and_mask_user_data 콜백에서 처리
+    return {"success": True, "cursor": cursor}
+
+
 def format_and_mask_user_data(
     # callback_context: CallbackContext,
     tool: BaseTool,
@@ -91,6 +348,10 @@ def format_and_mask_user_data(
     """
     툴 호출 결과를 확인하고, 사용자 데이터를 지정된 포맷으로 정리하고 일부 정보를 마스킹하여
     LLM 컨텍스트에 전달합니다.
+
+    조회 툴은 결과를 대화별 저장소에 보관하고 cursor만 반환하므로, 콜백은 cursor
+    위치부터 응답 크기 예산 안에 들어가는 페이지(첫 페이지는 전체 집계 포함)만 만들고,
+    나머지는 next_cursor로 get_user_list_page를 통해 이어서 조회하도록 합니다.
     """
     print("🔄 [Callback] format_and_mask_user_data 실행")
 
@@ -102,51 +363,25 @@ def format_and_mask_user_data(
         print(f"Callback skipping masking due to error: {result.get('error')}")
         return None
 
-    if "data" in result:
-        original_data_list = result["data"]
-
-        if not original_data_list:
-            final_summary_text = "조회된 사용자 데이터가 없습니다."
+    if "cursor" in result:
+        try:
+            result_id, rows, offset = load_user_results(
+                result_owner(tool_context), result["cursor"]
+            )
+        except ValueError as error:
+            report = {"success": False, "error": str(error)}
         else:
-            formatted_output_lines = []
-
-            for user in original_data_list:
-                email = user.get("email", "N/A")
-
-                # 📧 보안 마스킹 적용
-                if "@" in email:
-                    local_part, domain_part = email.split("@")
-                    masked_local_part = local_part[:3] + "***"
-                    masked_email = f"{masked_local_part}@{domain_part}"
-                else:
-                    masked_email = email
-
-                # 📝 LLM이 요약하기 쉽도록 포맷 구성
-                formatted_output_lines.append(
-                    f"이메일: {masked_email} | 별칭: {user.get('별칭_aliases', '없음')} "
-                    f"| 역할: {user.get('역할_isAdmin', '일반')} | 상태: {user.get('상태_status')}"
-                )
-
-        # 3. 마스킹된 데이터로 새 Content 객체 생성
+            report = build_user_page(rows, result_id, offset=offset)
+            # 조회 툴은 limit을 넘는 전체 일치 수를 따로 알려줌
+            if "total_matches" in result:
+                report["total_matches"] = result["total_matches"]
+            report["success"] = True
+
         # 🚨 types.Content를 반환하여 툴의 원래 JSON 응답을 덮어씁니다.
-        new_content = types.Content(
+        return types.Content(
             role="function",
-            parts=[
-                types.Part.from_text(
-                    text=json.dumps(
-                        {
-                            # 🚨 수정: 요약 리스트만 전달하고, 개수는 별도 필드로 전달
-                            "user_summary_list": formatted_output_lines,
-                            "user_count": (
-                                len(original_data_list) if original_data_list else 0
-                            ),
-                            "success": True,
-                        }
-                    )
-                ),
-            ],
+            parts=[types.Part.from_text(text=json.dumps(report, ensure_ascii=False))],
         )
-        return new_content
 
     # 툴 호출 결과가 success: False였거나 예상치 못한 형식인 경우, None 반환
     return None
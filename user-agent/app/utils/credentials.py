@@ -0,0 +1,197 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+from google.auth.exceptions import GoogleAuthError
+
+from .http_transport import get_auth_request
+
+# 만료까지 이 시간(초)보다 적게 남은 토큰은 미리 갱신합니다.
+REFRESH_MARGIN_SECONDS = int(os.getenv("CREDENTIAL_REFRESH_MARGIN_SECONDS", "300"))
+# 백그라운드 갱신 스레드가 캐시를 점검하는 주기(초)
+REFRESH_CHECK_INTERVAL_SECONDS = int(
+    os.getenv("CREDENTIAL_REFRESH_CHECK_INTERVAL_SECONDS", "60")
+)
+# 이 시간(초) 동안 사용되지 않은 자격 증명은 백그라운드 갱신을 멈추고 캐시에서 제거
+CREDENTIAL_IDLE_TTL_SECONDS = int(os.getenv("CREDENTIAL_IDLE_TTL_SECONDS", "1800"))
+# 보관하는 최대 자격 증명 수 (초과 시 가장 오래 사용하지 않은 것부터 제거)
+CREDENTIAL_CACHE_SIZE = int(os.getenv("CREDENTIAL_CACHE_SIZE", "1024"))
+
+CacheKey = tuple[str, str, tuple[str, ...]]
+
+
+class _CacheEntry:
+    def __init__(self) -> None:
+        self.credentials: Any = None
+        self.last_used = time.monotonic()
+        # 같은 키에 대한 발급/갱신은 한 번만 진행하고, 동시 호출자는 완료를 기다립니다.
+        self.lock = threading.Lock()
+
+
+class DelegatedCredentialCache:
+    """
+    도메인 전체 위임 자격 증명을 (subject, admin_email, 정렬된 scopes) 단위로 프로세스
+    전역에 보관하고, 만료 전에 백그라운드에서 토큰을 갱신하는 캐시입니다.
+
+    mint는 (subject, scopes)를 받아 새 자격 증명을 만드는 함수이며,
+    서비스 계정 키를 읽는 작업은 키별로 최초 한 번만 수행됩니다.
+    최근 idle_ttl_seconds 안에 사용된 항목만 백그라운드에서 갱신하고, 그보다 오래
+    사용되지 않았거나 max_entries를 넘는 항목은 LRU 순서로 제거합니다.
+    """
+
+    def __init__(
+        self,
+        mint: Callable[[str, list[str]], Any],
+        refresh_margin_seconds: int = REFRESH_MARGIN_SECONDS,
+        check_interval_seconds: int = REFRESH_CHECK_INTERVAL_SECONDS,
+        idle_ttl_seconds: int = CREDENTIAL_IDLE_TTL_SECONDS,
+        max_entries: int = CREDENTIAL_CACHE_SIZE,
+    ) -> None:
+        self._mint = mint
+        self._refresh_margin_seconds = refresh_margin_seconds
+        self._check_interval_seconds = check_interval_seconds
+        self._idle_ttl_seconds = idle_ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, _CacheEntry] = OrderedDict()
+        self._entries_lock = threading.Lock()
+        self._refresher: threading.Thread | None = None
+        self._request = get_auth_request()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "background_refreshes": 0,
+            "failures": 0,
+            "evictions": 0,
+        }
+
+    def get(
+        self, admin_email: str, scopes: Sequence[str], subject: str | None = None
+    ) -> Any:
+        """
+        유효한 토큰이 있는 자격 증명을 반환합니다. 발급 또는 갱신에 실패하면 None.
+
+        Args:
+            admin_email: 요청을 수행하는 관리자 이메일.
+            scopes: 요청할 OAuth 범위 목록.
+            subject: 위임 대상 사용자. 지정하지 않으면 admin_email로 위임합니다.
+        """
+        subject = subject or admin_email
+        key = (subject.lower(), admin_email.lower(), tuple(sorted(scopes)))
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _CacheEntry()
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+            else:
+                self._entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+        self._ensure_refresher()
+
+        if self._is_fresh(entry.credentials):
+            self._count("hits")
+            return entry.credentials
+
+        with entry.lock:
+            # 대기하는 동안 다른 호출자가 갱신을 마쳤다면 그 결과를 공유합니다.
+            if self._is_fresh(entry.credentials):
+                self._count("hits")
+                return entry.credentials
+
+            self._count("misses")
+            try:
+                if entry.credentials is None:
+                    entry.credentials = self._mint(subject, list(key[2]))
+                if entry.credentials is None:
+                    return None
+                entry.credentials.refresh(self._request)
+                self._count("refreshes")
+            except GoogleAuthError as error:
+                self._count("failures")
+                logging.warning(f"자격 증명 발급/갱신 실패 ({subject}): {error}")
+                return None
+            return entry.credentials
+
+    def stats(self) -> dict[str, int]:
+        with self._entries_lock:
+            size = sum(
+                1 for entry in self._entries.values() if entry.credentials is not None
+            )
+            return {**self._stats, "size": size}
+
+    def _is_fresh(self, credentials: Any) -> bool:
+        if credentials is None or not credentials.valid:
+            return False
+        if credentials.expiry is None:
+            return True
+        # google-auth의 expiry는 timezone 정보가 없는 UTC 시각입니다.
+        remaining = credentials.expiry - datetime.now(timezone.utc).replace(tzinfo=None)
+        return remaining.total_seconds() > self._refresh_margin_seconds
+
+    def _count(self, name: str) -> None:
+        with self._entries_lock:
+            self._stats[name] += 1
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+        with self._entries_lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop, name="credential-refresher", daemon=True
+                )
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        """
+        최근 사용된 항목 중 만료가 가까운 토큰을 요청 경로 밖에서 미리 갱신하고,
+        오래 사용되지 않은 항목은 제거합니다.
+        """
+        while True:
+            time.sleep(self._check_interval_seconds)
+            idle_before = time.monotonic() - self._idle_ttl_seconds
+            with self._entries_lock:
+                idle = [
+                    key
+                    for key, entry in self._entries.items()
+                    if entry.last_used < idle_before
+                ]
+                for key in idle:
+                    del self._entries[key]
+                self._stats["evictions"] += len(idle)
+                entries = list(self._entries.values())
+            for entry in entries:
+                if entry.credentials is None or self._is_fresh(entry.credentials):
+                    continue
+                # 요청 경로에서 이미 갱신 중이면 건너뜁니다.
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                try:
+                    entry.credentials.refresh(self._request)
+                    self._count("background_refreshes")
+                except GoogleAuthError as error:
+                    self._count("failures")
+                    logging.warning(f"자격 증명 백그라운드 갱신 실패: {error}")
+                finally:
+                    entry.lock.release()
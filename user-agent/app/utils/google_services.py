@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from .http_transport import authorized_http
+
+# 스레드마다 보관하는 서비스 객체 수 (자격 증명별 1개)
+SERVICE_CACHE_SIZE = int(os.getenv("GOOGLE_SERVICE_CACHE_SIZE", "64"))
+
+_local = threading.local()
+
+
+@functools.cache
+def _discovery_document(api_name: str, api_version: str) -> dict | None:
+    """google-api-python-client에 포함된 디스커버리 문서를 프로세스당 한 번만 파싱합니다."""
+    content = get_static_doc(api_name, api_version)
+    return json.loads(content) if content else None
+
+
+def get_service(
+    api_name: str, api_version: str, credentials: Any, cache: bool = True
+) -> Any:
+    """
+    Google API 서비스 객체를 반환합니다.
+
+    디스커버리 문서는 네트워크 대신 패키지에 포함된 문서를 사용하고, 만들어진 서비스
+    객체는 (API, 버전, 자격 증명) 단위로 재사용합니다. httplib2 연결은 스레드 간에
+    공유할 수 없으므로 캐시는 스레드별로 둡니다. 자격 증명은 객체 동일성으로 비교하므로
+    캐시된 자격 증명(토큰 갱신 포함)을 넘기면 같은 서비스 객체가 재사용됩니다.
+    요청마다 새로 만드는 일회용 자격 증명은 cache=False로 넘겨, 다시 쓰이지 않을
+    서비스 객체(와 토큰)가 캐시에 남지 않도록 합니다.
+    """
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = OrderedDict()
+
+    key = (api_name, api_version, id(credentials))
+    cached = services.get(key)
+    # id는 객체가 사라진 뒤 재사용될 수 있으므로 자격 증명 객체가 같은지 함께 확인
+    if cache and cached is not None and cached[0] is credentials:
+        services.move_to_end(key)
+        return cached[1]
+
+    # 서비스 객체는 스레드별 공용 연결(keep-alive)을 통해 요청을 보냄
+    http = authorized_http(credentials)
+    document = _discovery_document(api_name, api_version)
+    if document is not None:
+        service = build_from_document(document, http=http)
+    else:
+        # 패키지에 포함되지 않은 API는 기존 방식대로 디스커버리 문서를 조회
+        service = build(api_name, api_version, http=http)
+
+    if cache:
+        services[key] = (credentials, service)
+        while len(services) > SERVICE_CACHE_SIZE:
+            services.popitem(last=False)
+    return service
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sys
+import types
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+# auth.py는 배포 환경에서 저장소 밖에 두므로, 자격 증명이 필요 없는 이 테스트에서는
+# 빈 구현으로 대신합니다.
+sys.modules.setdefault(
+    "auth", types.SimpleNamespace(get_delegated_credentials=lambda *args: None)
+)
+
+from app.directory_cache import directory_cache  # noqa: E402
+from app.user_tools import _load_directory  # noqa: E402
+
+PAGE_SIZE = 2
+
+
+def _http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"")
+
+
+class _Request:
+    def __init__(self, run) -> None:
+        self.run = run
+        self.headers: dict[str, str] = {}
+
+    def execute(self):
+        result = self.run()
+        if self.headers.get("If-None-Match") == result["etag"]:
+            raise _http_error(304)
+        return result
+
+
+class FakeDirectory:
+    """페이지 토큰에 발급 세대를 붙여, expire_tokens 이후 이전 토큰을 거부합니다."""
+
+    def __init__(self, user_count: int) -> None:
+        self.users_data = [
+            {"primaryEmail": f"user{index}@example.com"} for index in range(user_count)
+        ]
+        self.generation = 0
+        self.rejected_tokens: list[str] = []
+
+    def expire_tokens(self) -> None:
+        self.generation += 1
+
+    def users(self):
+        return self
+
+    def list(self, pageToken=None, maxResults=None, **kwargs):
+        def run():
+            start = 0
+            if pageToken:
+                generation, offset = pageToken.split(":")
+                if int(generation) != self.generation:
+                    self.rejected_tokens.append(pageToken)
+                    raise _http_error(400)
+                start = int(offset)
+            users = self.users_data[start : start + PAGE_SIZE]
+            result = {
+                "users": users,
+                "etag": hashlib.md5(json.dumps(users).encode()).hexdigest(),
+            }
+            if start + PAGE_SIZE < len(self.users_data):
+                result["nextPageToken"] = f"{self.generation}:{start + PAGE_SIZE}"
+            return result
+
+        return _Request(run)
+
+
+def _emails(snapshot) -> list[str]:
+    return [user["primaryEmail"] for user in snapshot.iter_users()]
+
+
+def test_expired_reused_page_token_restarts_listing() -> None:
+    service = FakeDirectory(user_count=5)
+    first = _load_directory(service, "admin@example.com", "expired.example.com")
+
+    # 첫 페이지는 304로 재사용되지만, 그 페이지에 저장된 토큰은 만료됨
+    service.expire_tokens()
+    restarted = directory_cache.stats()["restarted"]
+    snapshot = _load_directory(
+        service, "admin@example.com", "expired.example.com", refresh=True
+    )
+
+    assert service.rejected_tokens == ["0:2"]
+    assert directory_cache.stats()["restarted"] == restarted + 1
+    assert _emails(snapshot) == _emails(first)
+    assert all(
+        page.next_page_token is None or page.next_page_token.startswith("1:")
+        for page in snapshot.pages
+    )
+
+
+def test_error_on_fresh_page_token_is_raised() -> None:
+    service = FakeDirectory(user_count=5)
+    _load_directory(service, "admin@example.com", "fresh.example.com")
+
+    # 데이터가 바뀌어 304가 아니면 토큰을 재사용하지 않으므로 오류를 그대로 전달
+    service.users_data[0] = {"primaryEmail": "changed@example.com"}
+    original_list = service.list
+
+    def failing_list(pageToken=None, **kwargs):
+        if pageToken:
+            return _Request(lambda: (_ for _ in ()).throw(_http_error(400)))
+        return original_list(pageToken=pageToken, **kwargs)
+
+    service.list = failing_list
+    with pytest.raises(HttpError):
+        _load_directory(service, "admin@example.com", "fresh.example.com", refresh=True)
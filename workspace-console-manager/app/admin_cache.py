@@ -0,0 +1,294 @@
+import base64
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from cryptography.fernet import Fernet, InvalidToken
+
+# 슈퍼 관리자 확인 결과를 다시 확인하지 않고 사용하는 시간(초)
+ADMIN_VERIFY_CACHE_TTL_SECONDS = float(
+    os.getenv("ADMIN_VERIFY_CACHE_TTL_SECONDS", "300")
+)
+# 토큰/사용자별로 보관하는 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+ADMIN_VERIFY_CACHE_SIZE = int(os.getenv("ADMIN_VERIFY_CACHE_SIZE", "1024"))
+# 확인 결과를 재시작 후에도 유지하고 워커 프로세스 간에 공유할 SQLite 파일 경로.
+# 비어 있으면 프로세스 메모리에만 보관합니다.
+ADMIN_VERIFY_CACHE_PATH = os.getenv("ADMIN_VERIFY_CACHE_PATH", "")
+# SQLite를 여러 워커가 함께 쓸 때 잠금을 기다리는 시간(초)
+SQLITE_BUSY_TIMEOUT_SECONDS = 5
+
+# 이메일 원문을 저장하던 이전 버전의 테이블 (시작 시 삭제)
+_LEGACY_TABLES = ("verified_identities", "admin_verdicts")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS identity_cache (
+    token_hash TEXT PRIMARY KEY,
+    email_hash TEXT NOT NULL,
+    encrypted_email BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_identity_cache_email_hash
+    ON identity_cache (email_hash);
+CREATE TABLE IF NOT EXISTS verdict_cache (
+    email_hash TEXT PRIMARY KEY,
+    is_admin INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _token_cipher(access_token: str) -> Fernet:
+    # 토큰 원문에서 유도한 키로 이메일을 암호화하므로, 파일만으로는 이메일을 알 수 없음
+    key = hashlib.sha256(b"admin-cache-identity:" + access_token.encode("utf-8"))
+    return Fernet(base64.urlsafe_b64encode(key.digest()))
+
+
+class AdminVerificationCache:
+    """
+    세션과 관계없이 공유되는 슈퍼 관리자 확인 결과 캐시입니다.
+
+    - identities: 액세스 토큰 해시 → 확인된 사용자 이메일 (userinfo 호출 생략)
+    - verdicts: 이메일 해시 → 슈퍼 관리자 여부 (Directory users.get 호출 생략)
+
+    토큰 원문은 보관하지 않으며, 항목은 TTL이 지나거나 크기 상한을 넘으면 제거됩니다.
+    revoke로 특정 사용자(또는 전체)의 결과를 즉시 무효화할 수 있습니다.
+
+    path를 지정하면 SQLite 파일이 유일한 저장소가 되어 모든 조회가 파일을 읽으므로,
+    한 워커에서 revoke한 결과가 같은 파일을 쓰는 모든 워커에 바로 반영됩니다.
+    파일에는 이메일 원문 대신 해시와, 토큰으로만 복호화할 수 있는 암호문을 저장합니다.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = ADMIN_VERIFY_CACHE_TTL_SECONDS,
+        max_entries: int = ADMIN_VERIFY_CACHE_SIZE,
+        path: str = "",
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._identities: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._verdicts: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._stats = {
+            "identity_hits": 0,
+            "identity_misses": 0,
+            "verdict_hits": 0,
+            "verdict_misses": 0,
+            "evictions": 0,
+            "revocations": 0,
+        }
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False
+            )
+            self._drop_legacy_tables()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            self._purge_expired()
+
+    @property
+    def shared(self) -> bool:
+        """여러 워커 프로세스가 같은 결과(및 revoke)를 보는지 여부."""
+        return self._conn is not None
+
+    def get_identity(self, access_token: str) -> str | None:
+        """액세스 토큰으로 이미 확인한 사용자 이메일을 반환합니다. 없으면 None."""
+        key = _hash(access_token)
+        with self._lock:
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT encrypted_email, expires_at FROM identity_cache "
+                    "WHERE token_hash = ?",
+                    (key,),
+                ).fetchone()
+                email = None
+                if row is not None and row[1] > time.time():
+                    try:
+                        email = (
+                            _token_cipher(access_token).decrypt(row[0]).decode("utf-8")
+                        )
+                    except InvalidToken:
+                        email = None
+            else:
+                entry = self._identities.get(key)
+                email = entry[0] if entry and entry[1] > time.time() else None
+                if email is not None:
+                    self._identities.move_to_end(key)
+            self._stats["identity_hits" if email else "identity_misses"] += 1
+            return email
+
+    def put_identity(
+        self, access_token: str, email: str, expires_at: float | None = None
+    ) -> None:
+        """
+        토큰 → 이메일 확인 결과를 저장합니다. expires_at(토큰 만료 시각, epoch 초)이
+        TTL보다 이르면 토큰 만료 시각까지만 보관합니다.
+        """
+        expires_at = self._expiry(expires_at)
+        key = _hash(access_token)
+        with self._lock:
+            if self._conn is not None:
+                self._write(
+                    "INSERT OR REPLACE INTO identity_cache VALUES (?, ?, ?, ?)",
+                    (
+                        key,
+                        _hash(email.lower()),
+                        _token_cipher(access_token).encrypt(email.encode("utf-8")),
+                        expires_at,
+                    ),
+                )
+                return
+            self._identities[key] = (email, expires_at)
+            self._identities.move_to_end(key)
+            self._evict(self._identities)
+
+    def get_verdict(self, email: str) -> bool | None:
+        """사용자의 슈퍼 관리자 여부를 반환합니다. 캐시에 없으면 None."""
+        key = _hash(email.lower())
+        with self._lock:
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT is_admin, expires_at FROM verdict_cache "
+                    "WHERE email_hash = ?",
+                    (key,),
+                ).fetchone()
+                entry = None if row is None else (bool(row[0]), row[1])
+            else:
+                entry = self._verdicts.get(key)
+            if entry is None or entry[1] <= time.time():
+                self._stats["verdict_misses"] += 1
+                return None
+            if self._conn is None:
+                self._verdicts.move_to_end(key)
+            self._stats["verdict_hits"] += 1
+            return entry[0]
+
+    def put_verdict(self, email: str, is_admin: bool) -> None:
+        key = _hash(email.lower())
+        expires_at = self._expiry(None)
+        with self._lock:
+            if self._conn is not None:
+                self._write(
+                    "INSERT OR REPLACE INTO verdict_cache VALUES (?, ?, ?)",
+                    (key, int(is_admin), expires_at),
+                )
+                return
+            self._verdicts[key] = (is_admin, expires_at)
+            self._verdicts.move_to_end(key)
+            self._evict(self._verdicts)
+
+    def revoke(self, email: str | None = None) -> int:
+        """
+        사용자(이메일)의 확인 결과와 해당 사용자로 확인된 토큰을 모두 무효화합니다.
+        email을 생략하면 전체를 무효화합니다. 제거한 항목 수를 반환합니다.
+        """
+        email_hash = None if email is None else _hash(email.lower())
+        with self._lock:
+            self._stats["revocations"] += 1
+            if self._conn is not None:
+                with self._conn:
+                    removed = self._conn.execute(
+                        "DELETE FROM identity_cache WHERE ? IS NULL OR email_hash = ?",
+                        (email_hash, email_hash),
+                    ).rowcount
+                    removed += self._conn.execute(
+                        "DELETE FROM verdict_cache WHERE ? IS NULL OR email_hash = ?",
+                        (email_hash, email_hash),
+                    ).rowcount
+                return removed
+
+            if email is None:
+                removed = len(self._identities) + len(self._verdicts)
+                self._identities.clear()
+                self._verdicts.clear()
+                return removed
+            email = email.lower()
+            tokens = [
+                key
+                for key, (owner, _) in self._identities.items()
+                if owner.lower() == email
+            ]
+            for key in tokens:
+                del self._identities[key]
+            removed = len(tokens)
+            if self._verdicts.pop(email_hash, None) is not None:
+                removed += 1
+            return removed
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            if self._conn is not None:
+                identities = self._conn.execute(
+                    "SELECT COUNT(*) FROM identity_cache"
+                ).fetchone()[0]
+                verdicts = self._conn.execute(
+                    "SELECT COUNT(*) FROM verdict_cache"
+                ).fetchone()[0]
+            else:
+                identities = len(self._identities)
+                verdicts = len(self._verdicts)
+            return {
+                **self._stats,
+                "identities": identities,
+                "verdicts": verdicts,
+                "shared": self.shared,
+            }
+
+    def _expiry(self, expires_at: float | None) -> float:
+        ttl_expiry = time.time() + self.ttl_seconds
+        return ttl_expiry if expires_at is None else min(ttl_expiry, expires_at)
+
+    def _evict(self, entries: OrderedDict) -> None:
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _write(self, sql: str, params: tuple) -> None:
+        """파일에 기록하면서 만료된 항목과 크기 상한을 넘는 오래된 항목을 정리합니다."""
+        with self._conn:
+            self._conn.execute(sql, params)
+        self._purge_expired()
+
+    def _drop_legacy_tables(self) -> None:
+        """이전 테이블을 삭제하고 VACUUM으로 파일에 남은 이메일 원문까지 지웁니다."""
+        legacy = [
+            name
+            for (name,) in self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+            if name in _LEGACY_TABLES
+        ]
+        if not legacy:
+            return
+        with self._conn:
+            for name in legacy:
+                self._conn.execute(f"DROP TABLE {name}")
+        self._conn.execute("VACUUM")
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        with self._conn:
+            for table in ("identity_cache", "verdict_cache"):
+                self._conn.execute(f"DELETE FROM {table} WHERE expires_at <= ?", (now,))
+                # 만료 시각이 가장 이른 항목부터 max_entries를 넘는 만큼 제거
+                evicted = self._conn.execute(
+                    f"DELETE FROM {table} WHERE rowid IN ("
+                    f"SELECT rowid FROM {table} ORDER BY expires_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+                self._stats["evictions"] += evicted
+
+
+admin_verification_cache = AdminVerificationCache(path=ADMIN_VERIFY_CACHE_PATH)
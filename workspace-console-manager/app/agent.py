@@ -13,13 +13,17 @@
 # limitations under the License.
 
 
+import os
+
 from google.adk.agents.llm_agent import Agent
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 from google.adk.apps.app import App
 from google.adk.tools.authenticated_function_tool import \
     AuthenticatedFunctionTool
 
+from .fan_out import dispatch_to_sub_agents
+from .fast_router import fast_route
 from .oauth_tools import auth_config, verify_super_admin_status
+from .remote_agents import remote_agent_pool
 
 admin_verification_tool = AuthenticatedFunctionTool(
     func=verify_super_admin_status,
@@ -29,16 +33,23 @@ admin_verification_tool = AuthenticatedFunctionTool(
     ),
 )
 
-user_agent = RemoteA2aAgent(
+# 하위 에이전트는 연결 풀을 공유하는 클라이언트로 만들고, 카드는 서버 시작 시 미리 조회
+user_agent = remote_agent_pool.create_agent(
     name="user_agent",
     description="사용자의 계정 정보(프로필, 역할, 상태 등)를 조회합니다. 이 에이전트 외에는 사용자 관련 질문에 답하지 마세요.",
-    agent_card=f"http://localhost:8001/a2a/app/.well-known/agent-card.json",
+    agent_card_url=os.getenv(
+        "USER_AGENT_CARD_URL",
+        "http://localhost:8001/a2a/app/.well-known/agent-card.json",
+    ),
 )
 
-mail_agent = RemoteA2aAgent(
+mail_agent = remote_agent_pool.create_agent(
     name="mail_agent",
     description="특정 기간 내의 이메일 내역을 검색하고 조회합니다. 검색을 위해 기간/시간, 제목 또는 기타 분류 데이터를 필요로 합니다.",
-    agent_card=f"http://localhost:8002/a2a/app/.well-known/agent-card.json",
+    agent_card_url=os.getenv(
+        "MAIL_AGENT_CARD_URL",
+        "http://localhost:8002/a2a/app/.well-known/agent-card.json",
+    ),
 )
 
 
@@ -66,6 +77,9 @@ root_agent = Agent(
 
         3.  **이메일/메일 검색 요청:**
             요청이 'mail', 'email', '스팸', '헤더', '기간' 등 이메일 분석이나 조회와 관련 있다면, 임의의 함수를 생성하지 말고 'mail_agent' 에이전트를 반드시 사용하세요.
+
+        4.  **사용자 조회와 메일 조회가 함께 필요한 복합 요청:**
+            예: "정지된 사용자 목록과 지난주 스팸 메일을 보여줘"처럼 두 에이전트의 작업이 서로 독립적이라면, 차례로 위임하지 말고 'dispatch_to_sub_agents' 툴로 user_agent_request와 mail_agent_request를 한 번에 보내세요. 각 요청 문장에는 관리자 이메일, 도메인, 기간 등 필요한 정보를 모두 포함하세요. 두 결과(시간 초과나 오류가 난 쪽은 그 사실)를 합쳐 최종 요약을 작성하세요.
         
         ---
         
@@ -74,7 +88,9 @@ root_agent = Agent(
         * 툴 호출에 필요한 모든 필수 인자(parameters)는 현재 대화 내용이나 사용자에게 질문하여 **반드시 채워야 합니다.**
         * 두 툴 중 하나를 선택한 후, 그 결과를 사용자에게 친절하게 요약하여 전달하세요.
         """,
-    tools=[admin_verification_tool],
+    tools=[admin_verification_tool, dispatch_to_sub_agents],
     sub_agents=[user_agent, mail_agent],
+    # 키워드로 분명히 판단되는 요청은 LLM 호출 없이 바로 위임/거절
+    before_model_callback=fast_route,
 )
 app = App(root_agent=root_agent, name="app")
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from .oauth_tools import STATE_FLAG_KEY, STATE_NAMESPACE
+from .remote_agents import remote_agent_pool
+
+# 하위 에이전트 한 곳의 응답을 기다리는 최대 시간(초). 초과한 쪽만 timeout으로 처리
+FAN_OUT_BRANCH_TIMEOUT_SECONDS = float(
+    os.getenv("FAN_OUT_BRANCH_TIMEOUT_SECONDS", "120")
+)
+# 세션별로 하위 에이전트의 A2A context_id를 보관하는 상태 키 (후속 요청에서 대화 이어가기)
+CONTEXT_IDS_STATE_KEY = "fan_out_context_ids"
+
+_stats_lock = threading.Lock()
+_stats = {"dispatches": 0, "branches": 0, "timeouts": 0, "errors": 0}
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def fan_out_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+async def _run_branch(
+    agent_name: str, request: str, context_id: str | None
+) -> tuple[dict, str | None]:
+    """하위 에이전트 하나에 요청을 보내고 (결과, 새 context_id)를 반환합니다."""
+    started = time.perf_counter()
+    try:
+        text, context_id = await asyncio.wait_for(
+            remote_agent_pool.send_text(agent_name, request, context_id),
+            timeout=FAN_OUT_BRANCH_TIMEOUT_SECONDS,
+        )
+        result = {"status": "success", "response": text}
+    except asyncio.TimeoutError:
+        _count("timeouts")
+        result = {
+            "status": "timeout",
+            "error": f"{FAN_OUT_BRANCH_TIMEOUT_SECONDS:g}초 안에 응답하지 않았습니다.",
+        }
+    except Exception as exc:
+        _count("errors")
+        result = {"status": "error", "error": f"A2A 요청 실패: {exc}"}
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+    print(f"🛰️ [Fan-out] {agent_name} {result['status']} ({result['elapsed_seconds']}s)")
+    return result, context_id
+
+
+async def dispatch_to_sub_agents(
+    tool_context: ToolContext,
+    user_agent_request: Optional[str] = None,
+    mail_agent_request: Optional[str] = None,
+) -> dict:
+    """
+    서로 독립적인 하위 작업을 user_agent와 mail_agent에 동시에 요청하고 결과를 함께
+    반환합니다. 각 요청에는 하위 에이전트가 필요한 정보(관리자 이메일, 도메인,
+    기간 등)를 모두 포함해야 합니다.
+
+    Args:
+        user_agent_request: user_agent에 보낼 사용자/계정 조회 요청 문장.
+        mail_agent_request: mail_agent에 보낼 메일 검색/분석 요청 문장.
+    """
+    state_bucket = tool_context.state.get(STATE_NAMESPACE) or {}
+    if state_bucket.get(STATE_FLAG_KEY) is not True:
+        return {
+            "success": False,
+            "error": "verify_super_admin_status로 슈퍼 관리자 권한을 먼저 확인하세요.",
+        }
+
+    requests = {
+        name: request
+        for name, request in (
+            ("user_agent", user_agent_request),
+            ("mail_agent", mail_agent_request),
+        )
+        if request
+    }
+    if not requests:
+        return {"success": False, "error": "하위 에이전트에 보낼 요청이 없습니다."}
+
+    print(f"🛠️ [Tool] dispatch_to_sub_agents 실행 (Agents: {', '.join(requests)})")
+    _count("dispatches")
+    _count("branches", len(requests))
+
+    context_ids = dict(tool_context.state.get(CONTEXT_IDS_STATE_KEY) or {})
+    started = time.perf_counter()
+    branches = await asyncio.gather(
+        *(
+            _run_branch(name, request, context_ids.get(name))
+            for name, request in requests.items()
+        )
+    )
+
+    results = {}
+    for name, (result, context_id) in zip(requests, branches, strict=True):
+        results[name] = result
+        if context_id:
+            context_ids[name] = context_id
+    tool_context.state[CONTEXT_IDS_STATE_KEY] = context_ids
+
+    return {
+        "success": any(result["status"] == "success" for result in results.values()),
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+        "results": results,
+    }
@@ -0,0 +1,213 @@
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# 라우팅 점수가 이 값 이상이고 다른 후보보다 충분히 높을 때만 LLM 없이 바로 위임
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "2.0"))
+# 1순위 점수가 2순위 점수의 몇 배 이상이어야 확실한 요청으로 볼지
+ROUTER_MARGIN_RATIO = 2.0
+# 0으로 설정하면 빠른 라우팅을 끄고 모든 요청을 LLM이 판단합니다.
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "1") != "0"
+
+VERIFY_TOOL_NAME = "verify_super_admin_status"
+ADMIN_STATE_NAMESPACE = "auth_agent"
+ADMIN_STATE_FLAG_KEY = "is_super_admin"
+PENDING_AGENT_STATE_KEY = "fast_router_pending_agent"
+
+OFF_TOPIC_RESPONSE = (
+    "저는 Google Workspace 관리 관련 질문에만 답변할 수 있습니다. "
+    "관리자 이메일 조회와 같은 업무로 질문해 주시겠어요?"
+)
+PERMISSION_DENIED_RESPONSE = (
+    "죄송합니다만, 이 작업을 수행하려면 슈퍼 관리자 권한이 필요합니다."
+)
+
+
+@dataclass(frozen=True)
+class RouteRule:
+    """하위 에이전트 하나에 대한 키워드 규칙 (패턴이 맞으면 weight만큼 가산)."""
+
+    agent_name: str
+    pattern: str
+    weight: float
+
+
+# 오케스트레이터 instruction의 라우팅 규칙을 데이터로 옮긴 것. 모듈 로드 시 컴파일합니다.
+ROUTE_RULES = (
+    RouteRule(
+        "user_agent",
+        r"사용자\s*(목록|리스트|조회|현황)|유저\s*목록|users?\s*list|list\s+(all\s+)?users"
+        r"|계정\s*(목록|조회|상태)|정지된\s*(사용자|계정)|suspended\s+(users?|accounts?)"
+        r"|별칭|aliases?|조직\s*단위|org\s*unit",
+        2.0,
+    ),
+    RouteRule(
+        "user_agent", r"사용자|유저|\busers?\b|계정|\baccounts?\b|관리자\s*목록", 1.0
+    ),
+    RouteRule(
+        "mail_agent",
+        r"스팸|spam|헤더|headers?|피싱|phishing|\bspf\b|\bdkim\b|\bdmarc\b"
+        r"|메일\s*(함|내역|목록|조회|검색|분석)|mailbox",
+        2.0,
+    ),
+    RouteRule("mail_agent", r"메일|\bmails?\b|gmail|수신|발신|받은\s*편지", 1.0),
+    RouteRule("mail_agent", r"이메일|e-?mails?", 0.5),
+)
+
+# 관리 콘솔 업무와 무관한 것이 분명한 요청 (관련 키워드가 하나도 없을 때만 적용)
+_OFF_TOPIC_PATTERN = re.compile(
+    r"날씨|weather|농담|joke|레시피|recipe|요리|주식|stock|환율|번역|translate"
+    r"|노래|영화|movie|게임|\bgame|운세|poem|시를?\s*써"
+    r"|^\s*(안녕(하세요)?|hi|hello|hey)[\s!.?~]*$",
+    re.IGNORECASE,
+)
+# 이메일 주소나 도메인이 포함된 메시지는 진행 중인 요청에 대한 답변일 수 있음
+_ADDRESS_PATTERN = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.-]+|\b[\w-]+\.(com|net|org|kr|io)\b"
+)
+
+_COMPILED_RULES = [
+    (rule.agent_name, re.compile(rule.pattern, re.IGNORECASE), rule.weight)
+    for rule in ROUTE_RULES
+]
+
+
+def classify(text: str) -> tuple[str | None, dict[str, float]]:
+    """
+    요청 문장을 점수화하여 (확실한 대상 에이전트 또는 None, 에이전트별 점수)를 반환합니다.
+    관련 키워드 없이 무관한 요청 패턴만 맞으면 대상은 "off_topic"입니다.
+    """
+    scores: dict[str, float] = {}
+    for agent_name, pattern, weight in _COMPILED_RULES:
+        if pattern.search(text):
+            scores[agent_name] = scores.get(agent_name, 0.0) + weight
+
+    if not scores:
+        if _OFF_TOPIC_PATTERN.search(text) and not _ADDRESS_PATTERN.search(text):
+            return "off_topic", scores
+        return None, scores
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best_agent, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    if (
+        best_score >= ROUTER_CONFIDENCE_THRESHOLD
+        and best_score >= runner_up * ROUTER_MARGIN_RATIO
+    ):
+        return best_agent, scores
+    return None, scores
+
+
+class RouterMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {
+            "routed_user_agent": 0,
+            "routed_mail_agent": 0,
+            "verify_called": 0,
+            "rejected_off_topic": 0,
+            "rejected_not_admin": 0,
+            "llm_fallthrough": 0,
+        }
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        decisions = sum(counts.values())
+        skipped = decisions - counts["llm_fallthrough"]
+        return {
+            **counts,
+            "llm_skipped_ratio": round(skipped / decisions, 3) if decisions else 0.0,
+        }
+
+
+router_metrics = RouterMetrics()
+
+
+def _text_response(text: str) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)])
+    )
+
+
+def _function_call_response(name: str, args: dict) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+        )
+    )
+
+
+def _route_to(callback_context: CallbackContext, agent_name: str) -> LlmResponse:
+    """관리자 확인이 끝났으면 바로 위임하고, 아니면 확인 툴부터 호출합니다."""
+    admin_state = callback_context.state.get(ADMIN_STATE_NAMESPACE) or {}
+    if admin_state.get(ADMIN_STATE_FLAG_KEY) is True:
+        router_metrics.count(f"routed_{agent_name}")
+        return _function_call_response("transfer_to_agent", {"agent_name": agent_name})
+    if admin_state.get(ADMIN_STATE_FLAG_KEY) is False:
+        router_metrics.count("rejected_not_admin")
+        return _text_response(PERMISSION_DENIED_RESPONSE)
+
+    callback_context.state[PENDING_AGENT_STATE_KEY] = agent_name
+    router_metrics.count("verify_called")
+    return _function_call_response(VERIFY_TOOL_NAME, {})
+
+
+def fast_route(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """
+    오케스트레이터의 before_model_callback. 확실한 요청은 LLM 호출 없이 처리합니다.
+
+    - 새 사용자 요청: 키워드 점수가 충분하면 관리자 확인 후 해당 에이전트로 위임하고,
+      무관한 것이 분명하면 안내 문구로 거절합니다.
+    - 빠른 라우팅이 호출한 관리자 확인 툴의 응답: 결과에 따라 위임 또는 거절합니다.
+    - 그 외(애매한 요청, 후속 답변 등)는 None을 반환하여 LLM이 판단하도록 합니다.
+    """
+    if not FAST_ROUTER_ENABLED or not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or not last.parts:
+        return None
+
+    function_responses = [
+        part.function_response for part in last.parts if part.function_response
+    ]
+    if function_responses:
+        pending_agent = callback_context.state.get(PENDING_AGENT_STATE_KEY)
+        if not pending_agent or function_responses[-1].name != VERIFY_TOOL_NAME:
+            return None
+        admin_state = callback_context.state.get(ADMIN_STATE_NAMESPACE) or {}
+        if ADMIN_STATE_FLAG_KEY not in admin_state:
+            # OAuth 동의 대기 등으로 확인이 끝나지 않았으면 LLM이 결과를 안내하고,
+            # 인증 후 툴이 다시 실행되면 보류해 둔 에이전트로 위임
+            router_metrics.count("llm_fallthrough")
+            return None
+        callback_context.state[PENDING_AGENT_STATE_KEY] = None
+        return _route_to(callback_context, pending_agent)
+
+    text = " ".join(part.text for part in last.parts if part.text)
+    if not text.strip():
+        return None
+    if callback_context.state.get(PENDING_AGENT_STATE_KEY):
+        # 새 요청이 들어오면 이전 요청의 보류된 위임은 버림
+        callback_context.state[PENDING_AGENT_STATE_KEY] = None
+    target, _ = classify(text)
+    if target is None:
+        router_metrics.count("llm_fallthrough")
+        return None
+    if target == "off_topic":
+        router_metrics.count("rejected_off_topic")
+        return _text_response(OFF_TOPIC_RESPONSE)
+    return _route_to(callback_context, target)
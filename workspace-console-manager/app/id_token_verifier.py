@@ -0,0 +1,144 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+import threading
+import time
+
+import requests
+from google.auth import exceptions as google_auth_exceptions
+from google.auth import jwt
+
+from .utils.http_transport import get_requests_session
+
+# Google OAuth2 ID 토큰 서명 공개키 (kid → PEM 인증서)
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# 응답에 Cache-Control max-age가 없을 때 공개키를 보관하는 시간(초)
+ID_TOKEN_CERTS_TTL_SECONDS = float(os.getenv("ID_TOKEN_CERTS_TTL_SECONDS", "3600"))
+# 토큰의 kid가 캐시에 없을 때 공개키를 다시 받아오는 최소 간격(초).
+# 위조된 kid로 매 요청마다 인증서를 다시 받게 만드는 것을 막습니다.
+ID_TOKEN_CERTS_MIN_REFRESH_SECONDS = float(
+    os.getenv("ID_TOKEN_CERTS_MIN_REFRESH_SECONDS", "60")
+)
+# 서버와의 시계 오차 허용 범위(초)
+ID_TOKEN_CLOCK_SKEW_SECONDS = 60
+REQUEST_TIMEOUT_SECONDS = 10
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class IdTokenVerifier:
+    """
+    Google이 발급한 ID 토큰(JWT)을 로컬에서 검증하고 클레임을 반환합니다.
+
+    서명 공개키는 응답의 Cache-Control max-age 동안 캐시하며, 만료되었거나 토큰의
+    kid가 캐시에 없을 때(키 교체)만 다시 받아옵니다. kid 때문에 다시 받는 것은
+    ID_TOKEN_CERTS_MIN_REFRESH_SECONDS에 한 번으로 제한하고, 다시 받은 뒤에도 없는
+    kid의 토큰은 거부합니다.
+
+    access_token을 함께 넘기면 ID 토큰의 at_hash 클레임이 그 액세스 토큰에서
+    계산한 값과 같은지 확인하여, 다른 사용자의 ID 토큰을 끼워 넣는 것을 막습니다.
+    """
+
+    def __init__(self, audience: str) -> None:
+        self.audience = audience
+        self._certs: dict[str, str] = {}
+        self._certs_expire_at = 0.0
+        self._last_fetch = float("-inf")
+        self._lock = threading.Lock()
+        self._stats = {
+            "verified": 0,
+            "rejected": 0,
+            "unbound": 0,
+            "certs_fetches": 0,
+        }
+
+    def verify(self, token: str, access_token: str | None = None) -> dict | None:
+        """
+        서명, 발급자, 대상(audience), 만료와 (access_token이 주어지면) at_hash를
+        검증하고 클레임을 반환합니다. 검증에 실패하면 None을 반환합니다.
+        """
+        try:
+            header = jwt.decode_header(token)
+            certs = self._get_certs(header.get("kid"))
+            claims = jwt.decode(
+                token,
+                certs=certs,
+                audience=self.audience,
+                clock_skew_in_seconds=ID_TOKEN_CLOCK_SKEW_SECONDS,
+            )
+            if claims.get("iss") not in GOOGLE_ISSUERS:
+                raise ValueError(f"잘못된 발급자: {claims.get('iss')}")
+            if access_token is not None and not _at_hash_matches(
+                claims.get("at_hash"), access_token
+            ):
+                self._count("unbound")
+                raise ValueError("at_hash가 액세스 토큰과 일치하지 않습니다.")
+        except (
+            ValueError,
+            google_auth_exceptions.GoogleAuthError,
+            requests.RequestException,
+        ) as exc:
+            self._count("rejected")
+            logging.warning(f"ID 토큰 검증 실패: {exc}")
+            return None
+        self._count("verified")
+        return claims
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _get_certs(self, kid: str | None) -> dict[str, str]:
+        with self._lock:
+            now = time.monotonic()
+            expired = not self._certs or time.time() >= self._certs_expire_at
+            # 키 교체로 새 kid가 나타났을 수 있으므로 최소 간격이 지났으면 다시 받음
+            rotated = (
+                kid not in self._certs
+                and now - self._last_fetch >= ID_TOKEN_CERTS_MIN_REFRESH_SECONDS
+            )
+            if expired or rotated:
+                response = get_requests_session().get(
+                    GOOGLE_CERTS_URL, timeout=REQUEST_TIMEOUT_SECONDS
+                )
+                response.raise_for_status()
+                max_age = _MAX_AGE_PATTERN.search(
+                    response.headers.get("Cache-Control", "")
+                )
+                ttl = int(max_age.group(1)) if max_age else ID_TOKEN_CERTS_TTL_SECONDS
+                self._certs = response.json()
+                self._certs_expire_at = time.time() + ttl
+                self._last_fetch = now
+                self._stats["certs_fetches"] += 1
+            if kid not in self._certs:
+                raise ValueError(f"알 수 없는 서명 키: {kid}")
+            return self._certs
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+
+def _at_hash_matches(at_hash: str | None, access_token: str) -> bool:
+    """
+    OpenID Connect at_hash: 액세스 토큰 SHA-256 해시의 앞 절반을 base64url로
+    인코딩한 값 (Google ID 토큰은 RS256 서명).
+    """
+    if not at_hash:
+        return False
+    digest = hashlib.sha256(access_token.encode("ascii")).digest()
+    expected = base64.urlsafe_b64encode(digest[: len(digest) // 2]).rstrip(b"=")
+    return hmac.compare_digest(expected, at_hash.encode("ascii", "replace"))
+
+
+def get_id_token(oauth2) -> str | None:
+    """
+    OAuth2 자격 증명에 포함된 ID 토큰을 반환합니다. ADK의 OAuth2Auth는 추가 필드를
+    허용하므로, 클라이언트가 토큰 응답의 id_token을 함께 전달한 경우에만 존재합니다.
+    """
+    extra = oauth2.model_extra or {}
+    return extra.get("id_token") or extra.get("idToken")
@@ -9,7 +9,11 @@ from google.adk.auth import AuthCredential, AuthCredentialTypes, OAuth2Auth
 from google.adk.auth.auth_tool import AuthConfig
 from google.adk.tools import ToolContext
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+
+from .admin_cache import admin_verification_cache
+from .id_token_verifier import IdTokenVerifier, get_id_token
+from .utils.google_services import get_service
+from .utils.http_transport import get_requests_session
 
 load_dotenv()
 
@@ -32,6 +36,9 @@ STATE_RESULT_KEY = "result_message"
 STATE_FLAG_KEY = "is_super_admin"
 STATE_EMAIL_KEY = "user_email"
 
+# OAuth 흐름이 ID 토큰을 함께 전달하면 userinfo 호출 없이 로컬에서 이메일을 확인
+id_token_verifier = IdTokenVerifier(audience=GOOGLE_CLIENT_ID)
+
 
 auth_scheme = OAuth2(
     flows=OAuthFlows(
@@ -71,18 +78,14 @@ def _get_state_bucket(tool_context: ToolContext) -> dict[str, Any]:
 
 
 def _build_admin_service(access_token: str):
+    # 호출마다 새로 만드는 자격 증명이므로 서비스 객체를 캐시에 보관하지 않음
     creds = Credentials(token=access_token)
-    return build(
-        "admin",
-        "directory_v1",
-        credentials=creds,
-        cache_discovery=False,
-    )
+    return get_service("admin", "directory_v1", creds, cache=False)
 
 
 def _fetch_user_email(access_token: str) -> str:
     try:
-        response = requests.get(
+        response = get_requests_session().get(
             USERINFO_ENDPOINT,
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=REQUEST_TIMEOUT_SECONDS,
@@ -97,6 +100,22 @@ def _fetch_user_email(access_token: str) -> str:
     return user_email
 
 
+def _verified_email_from_id_token(oauth2: OAuth2Auth) -> str | None:
+    """
+    자격 증명에 ID 토큰이 있으면 로컬에서 검증하고 확인된 이메일을 반환합니다.
+    ID 토큰의 at_hash가 함께 전달된 액세스 토큰과 일치해야 하며(같은 토큰 응답에서
+    발급된 경우), ID 토큰이 없거나 검증/바인딩 확인에 실패하면 None을 반환하여
+    호출 측에서 액세스 토큰으로 userinfo를 조회하게 합니다.
+    """
+    token = get_id_token(oauth2)
+    if not token:
+        return None
+    claims = id_token_verifier.verify(token, access_token=oauth2.access_token)
+    if not claims or not claims.get("email_verified"):
+        return None
+    return claims.get("email")
+
+
 def _is_super_admin(access_token: str, user_email: str) -> bool:
     try:
         admin_service = _build_admin_service(access_token)
@@ -116,7 +135,7 @@ def verify_super_admin_status(
 ) -> str:
     """
     현재 인증된 사용자가 Google Workspace 슈퍼 관리자인지 확인합니다.
-    결과는 세션 상태에 캐시됩니다.
+    결과는 세션 상태와, 세션 간에 공유되는 admin_verification_cache에 캐시됩니다.
     """
     state_bucket = _get_state_bucket(tool_context)
     cached_result = state_bucket.get(STATE_RESULT_KEY)
@@ -129,8 +148,21 @@ def verify_super_admin_status(
     access_token = credential.oauth2.access_token
 
     try:
-        user_email = _fetch_user_email(access_token)
-        is_admin = _is_super_admin(access_token, user_email)
+        # 같은 토큰/사용자를 이미 확인했다면 userinfo, Directory 호출을 생략.
+        # 캐시에는 액세스 토큰에 묶인 것이 확인된 이메일(at_hash 일치 또는 userinfo)만
+        # 기록됩니다.
+        user_email = admin_verification_cache.get_identity(access_token)
+        if user_email is None:
+            user_email = _verified_email_from_id_token(
+                credential.oauth2
+            ) or _fetch_user_email(access_token)
+            admin_verification_cache.put_identity(
+                access_token, user_email, expires_at=credential.oauth2.expires_at
+            )
+        is_admin = admin_verification_cache.get_verdict(user_email)
+        if is_admin is None:
+            is_admin = _is_super_admin(access_token, user_email)
+            admin_verification_cache.put_verdict(user_email, is_admin)
     except RuntimeError as exc:
         return str(exc)
 
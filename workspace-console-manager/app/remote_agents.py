@@ -0,0 +1,255 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import httpx
+from a2a.client.card_resolver import A2ACardResolver
+from a2a.client.client import Client as A2AClient
+from a2a.client.client import ClientConfig as A2AClientConfig
+from a2a.client.client_factory import ClientFactory as A2AClientFactory
+from a2a.types import AgentCard, Message, Part, Role, Task, TextPart, TransportProtocol
+from a2a.utils.artifact import get_artifact_text
+from a2a.utils.message import get_message_text
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+
+# 하위 에이전트별 HTTP 연결 풀 설정
+A2A_MAX_CONNECTIONS = int(os.getenv("A2A_MAX_CONNECTIONS", "20"))
+A2A_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("A2A_KEEPALIVE_EXPIRY_SECONDS", "60"))
+A2A_TIMEOUT_SECONDS = float(os.getenv("A2A_TIMEOUT_SECONDS", "600"))
+# 백그라운드에서 에이전트 카드를 다시 확인하는 주기(초)
+AGENT_CARD_REVALIDATE_SECONDS = float(os.getenv("AGENT_CARD_REVALIDATE_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+# 카드 객체와 공용 클라이언트 팩토리는 RemoteA2aAgent 생성자로만 전달하므로,
+# 두 인자를 지원하지 않는 ADK 버전에서는 시작 시점에 바로 실패시킵니다.
+_REQUIRED_AGENT_PARAMS = {"agent_card", "a2a_client_factory"}
+_missing_params = _REQUIRED_AGENT_PARAMS - set(
+    inspect.signature(RemoteA2aAgent.__init__).parameters
+)
+if _missing_params:
+    raise ImportError(
+        "RemoteA2aAgent가 다음 생성자 인자를 지원하지 않습니다: "
+        f"{', '.join(sorted(_missing_params))}. google-adk 버전을 확인하세요."
+    )
+
+
+@dataclass
+class _RemoteAgentEntry:
+    agent: RemoteA2aAgent
+    description: str
+    client: httpx.AsyncClient
+    factory: A2AClientFactory
+    card_url: str
+    card: AgentCard | None = None
+    # 병렬 요청(send_text)에 쓰는 A2A 클라이언트. 카드를 받은 뒤 생성
+    a2a_client: A2AClient | None = None
+    card_fetched_at: float | None = None
+    stats: dict[str, int] = field(
+        default_factory=lambda: {
+            "requests": 0,
+            "new_connections": 0,
+            "card_fetches": 0,
+            "card_failures": 0,
+            "card_changes": 0,
+        }
+    )
+    # 이미 본 연결(network stream). 처음 보는 연결이면 새 TCP 연결로 집계
+    streams: weakref.WeakSet = field(default_factory=weakref.WeakSet)
+
+
+class RemoteAgentPool:
+    """
+    오케스트레이터의 RemoteA2aAgent들을 관리합니다.
+
+    - 하위 에이전트마다 keep-alive 연결 풀을 가진 httpx.AsyncClient 하나를 만들어
+      카드 조회와 모든 A2A RPC가 같은 연결을 재사용하도록 합니다.
+    - 서버 시작 시 에이전트 카드를 미리 받아 두고, 주기적으로 다시 확인하여 바뀐
+      경우에만 새 카드로 만든 RemoteA2aAgent로 교체합니다.
+
+    RemoteA2aAgent는 최초 위임 시 카드를 한 번만 확인하므로, 카드 교체는 내부 속성을
+    바꾸지 않고 공개 생성자(agent_card, a2a_client_factory)로 새 에이전트를 만들어
+    상위 에이전트의 sub_agents에서 바꿔 끼우는 방식으로 처리합니다.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, _RemoteAgentEntry] = {}
+        self._revalidate_task: asyncio.Task | None = None
+
+    def create_agent(
+        self, name: str, description: str, agent_card_url: str
+    ) -> RemoteA2aAgent:
+        """연결 풀을 공유하는 RemoteA2aAgent를 생성하고 등록합니다."""
+        entry: _RemoteAgentEntry | None = None
+
+        async def _on_response(response: httpx.Response) -> None:
+            entry.stats["requests"] += 1
+            stream = response.extensions.get("network_stream")
+            if stream is not None and stream not in entry.streams:
+                entry.streams.add(stream)
+                entry.stats["new_connections"] += 1
+
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout=A2A_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=A2A_MAX_CONNECTIONS,
+                max_keepalive_connections=A2A_MAX_CONNECTIONS,
+                keepalive_expiry=A2A_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            event_hooks={"response": [_on_response]},
+        )
+        # RemoteA2aAgent 기본값과 같은 설정에 공용 클라이언트만 지정
+        factory = A2AClientFactory(
+            config=A2AClientConfig(
+                httpx_client=client,
+                streaming=False,
+                polling=False,
+                supported_transports=[TransportProtocol.jsonrpc],
+            )
+        )
+        agent = RemoteA2aAgent(
+            name=name,
+            description=description,
+            agent_card=agent_card_url,
+            a2a_client_factory=factory,
+        )
+        entry = _RemoteAgentEntry(
+            agent=agent,
+            description=description,
+            client=client,
+            factory=factory,
+            card_url=agent_card_url,
+        )
+        self._entries[name] = entry
+        return agent
+
+    async def start(self) -> None:
+        """에이전트 카드를 미리 받아 두고 백그라운드 재확인을 시작합니다."""
+        await asyncio.gather(
+            *(self._refresh(entry) for entry in self._entries.values())
+        )
+        if self._revalidate_task is None:
+            self._revalidate_task = asyncio.create_task(self._revalidate_loop())
+
+    async def stop(self) -> None:
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+            self._revalidate_task = None
+        for entry in self._entries.values():
+            await entry.client.aclose()
+
+    async def send_text(
+        self, name: str, text: str, context_id: str | None = None
+    ) -> tuple[str, str | None]:
+        """
+        하위 에이전트에 텍스트 요청 하나를 보내고 (응답 텍스트, A2A context_id)를
+        반환합니다. 위임(transfer)과 같은 A2A 클라이언트와 연결 풀을 사용합니다.
+        """
+        entry = self._entries[name]
+        if entry.a2a_client is None:
+            await self._refresh(entry)
+        if entry.a2a_client is None:
+            raise RuntimeError(f"{name} 에이전트 카드를 가져오지 못했습니다.")
+        request = Message(
+            message_id=str(uuid.uuid4()),
+            role=Role.user,
+            parts=[Part(root=TextPart(text=text))],
+            context_id=context_id,
+        )
+        texts: list[str] = []
+        async for response in entry.a2a_client.send_message(request=request):
+            if isinstance(response, Message):
+                texts.append(get_message_text(response))
+                context_id = response.context_id or context_id
+                continue
+            task, _ = response
+            texts = _task_texts(task)
+            context_id = task.context_id or context_id
+        return "\n".join(text for text in texts if text), context_id
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            name: {
+                **entry.stats,
+                "card_cached": entry.card is not None,
+                "card_age_seconds": (
+                    round(time.time() - entry.card_fetched_at, 1)
+                    if entry.card_fetched_at
+                    else None
+                ),
+            }
+            for name, entry in self._entries.items()
+        }
+
+    async def _refresh(self, entry: _RemoteAgentEntry) -> None:
+        """카드를 다시 받아 바뀐 경우에만 에이전트에 반영합니다. 실패하면 기존 카드 유지."""
+        parsed_url = urlparse(entry.card_url)
+        resolver = A2ACardResolver(
+            httpx_client=entry.client,
+            base_url=f"{parsed_url.scheme}://{parsed_url.netloc}",
+        )
+        try:
+            card = await resolver.get_agent_card(relative_card_path=parsed_url.path)
+            if not card.url:
+                raise ValueError("에이전트 카드에 url이 없습니다.")
+        except Exception as exc:
+            entry.stats["card_failures"] += 1
+            logger.warning(f"⚠️ {entry.agent.name} 에이전트 카드 조회 실패: {exc}")
+            return
+
+        entry.stats["card_fetches"] += 1
+        entry.card_fetched_at = time.time()
+        if card == entry.card:
+            return
+
+        # 미리 받은 카드로 만든 에이전트는 위임 시 카드를 다시 조회하지 않음
+        self._replace_agent(
+            entry,
+            RemoteA2aAgent(
+                name=entry.agent.name,
+                description=entry.description,
+                agent_card=card,
+                a2a_client_factory=entry.factory,
+            ),
+        )
+        entry.a2a_client = entry.factory.create(card)
+        if entry.card is not None:
+            entry.stats["card_changes"] += 1
+            logger.info(f"🔄 {entry.agent.name} 에이전트 카드 변경 반영")
+        entry.card = card
+
+    @staticmethod
+    def _replace_agent(entry: _RemoteAgentEntry, agent: RemoteA2aAgent) -> None:
+        """상위 에이전트의 sub_agents에서 기존 에이전트를 새 에이전트로 바꿉니다."""
+        parent = entry.agent.parent_agent
+        if parent is not None:
+            parent.sub_agents = [
+                agent if sub_agent is entry.agent else sub_agent
+                for sub_agent in parent.sub_agents
+            ]
+            agent.parent_agent = parent
+        entry.agent = agent
+
+    async def _revalidate_loop(self) -> None:
+        while True:
+            await asyncio.sleep(AGENT_CARD_REVALIDATE_SECONDS)
+            await asyncio.gather(
+                *(self._refresh(entry) for entry in self._entries.values())
+            )
+
+
+def _task_texts(task: Task) -> list[str]:
+    """완료된 Task의 결과(artifact) 텍스트. 결과가 없으면 마지막 상태 메시지를 사용합니다."""
+    texts = [get_artifact_text(artifact) for artifact in task.artifacts or []]
+    if not any(texts) and task.status.message is not None:
+        texts = [get_message_text(task.status.message)]
+    return texts
+
+
+remote_agent_pool = RemoteAgentPool()
@@ -18,24 +18,33 @@ from contextlib import asynccontextmanager
 
 from a2a.server.apps import A2AFastAPIApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard
 from a2a.utils.constants import (
     AGENT_CARD_WELL_KNOWN_PATH,
     EXTENDED_AGENT_CARD_PATH,
 )
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from google.adk.artifacts.gcs_artifact_service import GcsArtifactService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.cloud import logging as google_cloud_logging
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider, export
 
+from app.admin_cache import admin_verification_cache
 from app.agent import app as adk_app
+from app.fan_out import fan_out_stats
+from app.fast_router import router_metrics
+from app.oauth_tools import id_token_verifier
+from app.remote_agents import remote_agent_pool
+from app.utils.admin_auth import require_admin_token
 from app.utils.gcs import create_bucket_if_not_exists
+from app.utils.session_store import (
+    PendingDiscardingRunner,
+    create_session_service,
+    is_persistent,
+)
+from app.utils.task_store import create_task_store
 from app.utils.tracing import CloudTraceLoggingSpanExporter
 from app.utils.typing import Feedback
 
@@ -74,20 +83,42 @@ A2A_RPC_PATH = f"/a2a/{adk_app.name}"
 logger.info(f"ADK App Name: {adk_app.name}")
 logger.info(f"A2A RPC Path: {A2A_RPC_PATH}")
 
+# uvicorn 워커 프로세스 수. 2 이상은 unshared_state_settings()의 모든 공유 저장소
+# 설정이 필요하며, 하나라도 없으면 워커 1개로 실행합니다.
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+
 
-runner = Runner(
+session_service = create_session_service()
+
+runner = PendingDiscardingRunner(
     app=adk_app,
     # artifact_service=GcsArtifactService(bucket_name=bucket_name),
-    session_service=InMemorySessionService(),
+    session_service=session_service,
 )
 
 custom_executor = A2aAgentExecutor(runner=runner)
 
+task_store = create_task_store()
+
 request_handler = DefaultRequestHandler(
-    agent_executor=custom_executor, task_store=InMemoryTaskStore()
+    agent_executor=custom_executor, task_store=task_store
 )
 
 
+def unshared_state_settings() -> list[str]:
+    """
+    여러 워커가 같은 상태를 보려면 필요한 공유 저장소 설정 중 비어 있는 것의 목록입니다.
+    (세션, A2A 작업, 슈퍼 관리자 확인 결과와 그 revoke)
+    """
+    shared = {
+        "SESSION_DB_URL": is_persistent(session_service),
+        # DB가 있으면 진행 중 작업은 항상 DB에서 읽으므로 다른 워커의 갱신도 보임
+        "TASK_STORE_DB_URL": task_store.durable,
+        "ADMIN_VERIFY_CACHE_PATH": admin_verification_cache.shared,
+    }
+    return [name for name, is_shared in shared.items() if not is_shared]
+
+
 async def build_dynamic_agent_card() -> AgentCard:
     """Agent Card를 동적으로 빌드하여 게이트웨이의 메타데이터를 정의합니다."""
     try:
@@ -136,7 +167,11 @@ async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
         logger.info("✅ A2A routes registered.")
     except Exception as e:
         logger.error(f"❌ Error during lifespan setup: {e}", exc_info=True)
+
+    # 첫 위임 전에 하위 에이전트 카드를 받아 두고 연결을 미리 맺어 둠
+    await remote_agent_pool.start()
     yield
+    await remote_agent_pool.stop()
 
 
 # 기존 함수 참조 유지
@@ -190,8 +225,63 @@ async def debug_middleware(request, call_next):
     return response
 
 
+@app.get("/stats")
+def get_stats() -> dict[str, dict]:
+    """Expose in-process cache statistics.
+
+    Returns:
+        Hit/miss, eviction and revocation counters of the admin verification cache
+        and local ID token verification counters, per sub-agent connection
+        reuse and agent card cache counters, fast-path routing decisions and the
+        share of requests that skipped the LLM, parallel fan-out counters, A2A
+        task store gauges, plus session event batching and DB pool counters when
+        sessions are persistent
+    """
+    return {
+        "admin_verification": admin_verification_cache.stats(),
+        "id_token": id_token_verifier.stats(),
+        "remote_agents": remote_agent_pool.stats(),
+        "router": router_metrics.stats(),
+        "fan_out": fan_out_stats(),
+        "tasks": task_store.stats(),
+        "sessions": session_service.stats() if is_persistent(session_service) else {},
+    }
+
+
+@app.post("/admin-cache/revoke", dependencies=[Depends(require_admin_token)])
+def revoke_admin_verification(email: str | None = None) -> dict[str, int]:
+    """Force re-verification of super admin status.
+
+    Requires ``Authorization: Bearer <ADMIN_API_TOKEN>``. With
+    ADMIN_VERIFY_CACHE_PATH set the revocation applies to every worker sharing
+    the file, because all of them read the cache from it.
+
+    Args:
+        email: Only revoke results for this user; all results when omitted
+
+    Returns:
+        Number of cache entries removed
+    """
+    return {"revoked": admin_verification_cache.revoke(email)}
+
+
 # Main execution
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="debug")
+    workers = SERVER_WORKERS
+    unshared = unshared_state_settings()
+    if workers > 1 and unshared:
+        logger.warning(
+            f"⚠️ {', '.join(unshared)} 설정 없이 여러 워커를 실행할 수 없어 "
+            "워커 1개로 실행합니다."
+        )
+        workers = 1
+    # 워커가 여러 개면 각 프로세스가 앱을 다시 import하도록 import 문자열로 전달
+    uvicorn.run(
+        "app.server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        log_level="debug",
+    )
@@ -0,0 +1,44 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import secrets
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+# 캐시 무효화 등 운영용 API 호출에 필요한 Bearer 토큰. 비어 있으면 운영용 API를 막습니다.
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def require_admin_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(_bearer)],
+) -> None:
+    """운영용 API의 FastAPI 의존성. Authorization: Bearer <ADMIN_API_TOKEN>을 확인합니다."""
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(
+            status_code=403,
+            detail="ADMIN_API_TOKEN이 설정되지 않아 운영용 API를 사용할 수 없습니다.",
+        )
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode("utf-8"), ADMIN_API_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="운영용 API 토큰이 올바르지 않습니다.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+from typing import Any
+
+import google.auth.transport.requests
+import google_auth_httplib2
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
+
+# 호스트별로 유지할 keep-alive 연결 수 (requests 세션)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+# 연결/응답 대기 시간(초)
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+# 0으로 설정하면 keep-alive를 끄고 요청마다 연결을 새로 맺습니다.
+HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "1") != "0"
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_local = threading.local()
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """timeout 없이 보낸 요청에 기본 대기 시간을 적용하는 어댑터."""
+
+    def __init__(self, timeout: float, **kwargs: Any) -> None:
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> Any:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def get_requests_session() -> requests.Session:
+    """
+    프로세스 공용 requests 세션을 반환합니다. 호스트별 연결 풀을 두고 연결을
+    재사용하므로 요청마다 TCP/TLS 연결을 새로 맺지 않습니다. timeout을 지정하지 않은
+    요청에는 HTTP_TIMEOUT_SECONDS가 적용됩니다.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = _TimeoutHTTPAdapter(
+                HTTP_TIMEOUT_SECONDS,
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if not HTTP_KEEP_ALIVE:
+                session.headers["Connection"] = "close"
+            _session = session
+        return _session
+
+
+def get_auth_request() -> google.auth.transport.requests.Request:
+    """토큰 발급/갱신에 사용할 google-auth 요청 객체 (공용 세션 사용)."""
+    return google.auth.transport.requests.Request(session=get_requests_session())
+
+
+def _get_thread_http() -> httplib2.Http:
+    # httplib2.Http는 스레드 간에 공유할 수 없으므로 스레드마다 하나씩 두고,
+    # 같은 스레드의 모든 Google API 호출이 호스트별 연결을 재사용합니다.
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+    return http
+
+
+def authorized_http(credentials: Any) -> Any:
+    """
+    googleapiclient 서비스에 넘길 인증된 HTTP 전송 객체를 반환합니다.
+    자격 증명만 요청마다 다르고, 하부 연결은 스레드별 공용 httplib2.Http를 사용합니다.
+    """
+    http = (
+        _get_thread_http()
+        if HTTP_KEEP_ALIVE
+        else httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+    )
+    return google_auth_httplib2.AuthorizedHttp(credentials, http=http)